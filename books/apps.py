@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class BooksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'books'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+
+        if settings.REQUEST_METRICS:
+            from .metrics import install_query_timer
+            connection_created.connect(install_query_timer)
@@ -0,0 +1,14 @@
+"""
+URLconf for ASGI deployments: the read endpoints are served by the native
+async views in ``books.async_views``, everything else by the router.
+"""
+from django.urls import include, path, re_path
+
+from . import async_views
+
+urlpatterns = [
+    path('books/', async_views.book_list),
+    path('books/<int:pk>/', async_views.book_detail),
+    re_path(r'^books/by-author/(?P<author>[^/.]+)/$', async_views.books_by_author),
+    path('', include('books.urls')),
+]
@@ -0,0 +1,170 @@
+"""
+Native async implementations of the book read endpoints for ASGI servers.
+
+Under ASGI every sync view runs in a worker thread, so a slow query ties up
+a thread for its whole duration. These views build the same querysets as
+``BookViewSet`` (queryset construction does not touch the database) and
+evaluate them with the async ORM, producing byte-identical JSON.
+
+Requests they do not cover - writes, cursor pagination, non-JSON renderers,
+invalid parameters and views configured with permission classes - are
+handed to the regular viewset, so behaviour never diverges.
+"""
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import JSONRenderer
+
+from .cache import acached_response
+from .conditional import conditional_response, make_etag, set_validators
+from .models import Book
+from .search import suggest_authors
+from .serializers import BookListSerializer
+from .views import BookViewSet
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+BY_AUTHOR_ACTIONS = {'get': 'by_author'}
+
+sync_list = sync_to_async(BookViewSet.as_view(LIST_ACTIONS))
+sync_detail = sync_to_async(BookViewSet.as_view(DETAIL_ACTIONS))
+sync_by_author = sync_to_async(BookViewSet.as_view(BY_AUTHOR_ACTIONS))
+
+
+class Fallback(Exception):
+    """Raised when a request has to be served by the sync viewset."""
+
+
+def init_view(request, actions, **kwargs):
+    """Set up a ``BookViewSet`` for ``request`` the way ``as_view()`` would."""
+    actions = {'head': actions['get'], **actions}
+    view = BookViewSet(action_map=actions)
+    for method, action in actions.items():
+        setattr(view, method, getattr(view, action))
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = None
+    view.request = view.initialize_request(request, **kwargs)
+    if request.method != 'GET' or any(cls is not AllowAny for cls in view.permission_classes):
+        raise Fallback
+    try:
+        renderer, media_type = view.perform_content_negotiation(view.request)
+    except APIException:
+        raise Fallback
+    if renderer.format != 'json':
+        raise Fallback
+    view.request.accepted_renderer, view.request.accepted_media_type = renderer, media_type
+    view.headers = view.default_response_headers
+    return view
+
+
+def add_view_headers(view, response):
+    for name, value in view.headers.items():
+        response[name] = value
+    return response
+
+
+def render(view, data, status=200):
+    """Render ``data`` like the viewset's ``Response`` would."""
+    request = view.request
+    content = JSONRenderer().render(data, request.accepted_media_type, {'request': request, 'view': view})
+    return add_view_headers(view, HttpResponse(content, status=status, content_type='application/json'))
+
+
+def not_modified(view, etag, last_modified=None):
+    """The viewset's 304 response for ``view.request``, or None."""
+    response = conditional_response(view.request, etag, last_modified)
+    if response is not None:
+        add_view_headers(view, response)
+    return response
+
+
+async def fetch(queryset):
+    return [row async for row in queryset.aiterator()]
+
+
+async def list_response(view):
+    try:
+        queryset = view.filter_queryset(view.get_queryset())
+    except APIException:
+        raise Fallback
+
+    paginator = view.paginator
+    page_size = paginator.get_page_size(view.request)
+    if not page_size:
+        books = await fetch(queryset)
+        etag = make_etag(view.request, books)
+        response = not_modified(view, etag) or render(view, view.get_serializer(books, many=True).data)
+        return set_validators(response, etag)
+
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    await django_paginator.acount()
+    try:
+        page = await django_paginator.apage(paginator.get_page_number(view.request, django_paginator))
+    except InvalidPage:
+        raise Fallback
+    paginator.page, paginator.request = page, view.request
+    etag = make_etag(view.request, page.object_list, paginator.get_paginated_response([]).data)
+    response = not_modified(view, etag)
+    if response is None:
+        data = view.get_serializer(page.object_list, many=True).data
+        response = render(view, paginator.get_paginated_response(data).data)
+    return set_validators(response, etag)
+
+
+async def detail_response(view, pk):
+    try:
+        queryset = view.filter_queryset(view.get_queryset())
+    except APIException:
+        raise Fallback
+    try:
+        book = await queryset.aget(pk=pk)
+    except Book.DoesNotExist:
+        return render(view, {'detail': 'No Book matches the given query.'}, status=404)
+    etag = make_etag(view.request, [book])
+    response = not_modified(view, etag, book.updated_at) or render(view, view.get_serializer(book).data)
+    return set_validators(response, etag, book.updated_at)
+
+
+@csrf_exempt
+async def book_list(request):
+    """Async ``GET /books/``."""
+    try:
+        view = init_view(request, LIST_ACTIONS)
+        params = view.request.query_params
+        if params.get('cursor') or params.get('pagination') == 'cursor':
+            raise Fallback
+        return await acached_response(view.request, lambda request: list_response(view))
+    except Fallback:
+        return await sync_list(request)
+
+
+@csrf_exempt
+async def book_detail(request, pk):
+    """Async ``GET /books/{id}/``."""
+    try:
+        view = init_view(request, DETAIL_ACTIONS, pk=pk)
+        return await acached_response(view.request, lambda request: detail_response(view, pk))
+    except Fallback:
+        return await sync_detail(request, pk=pk)
+
+
+@csrf_exempt
+async def books_by_author(request, author):
+    """Async ``GET /books/by-author/{author}/``."""
+    try:
+        view = init_view(request, BY_AUTHOR_ACTIONS, author=author)
+    except Fallback:
+        return await sync_by_author(request, author=author)
+    books = await fetch(Book.objects.filter(author__icontains=author).values(*BookListSerializer.Meta.fields))
+    data = {
+        'author': author,
+        'count': len(books),
+        'books': BookListSerializer(books, many=True).data
+    }
+    if not data['count']:
+        suggestions = await sync_to_async(suggest_authors)(Book.objects.all(), author, limit=5)
+        data['did_you_mean'] = [name for name, _ in suggestions]
+    return render(view, data)
@@ -0,0 +1,165 @@
+"""
+Reproducible in-process benchmark of the book API.
+
+``run_benchmark`` drives every scenario through Django's test client, so
+each request passes through the full middleware, view, serializer and
+renderer stack against the current database; only the network is missing.
+Every scenario reports latency percentiles, single-client throughput and
+SQL queries per request, and ``find_regressions`` compares a run with a
+saved baseline.
+"""
+import random
+import statistics
+import time
+from collections import namedtuple
+from urllib.parse import urlencode
+
+from django.db import connection
+from django.db.models import Max, Min
+from django.urls import reverse
+
+from .models import Book
+from .synthetic import TITLE_NOUNS, isbn_for
+
+# ``request(context, number)`` returns the path and the JSON body, if any
+Scenario = namedtuple('Scenario', 'name method request')
+
+SCENARIOS = [
+    Scenario('list', 'get', lambda context, number: (reverse('book-list'), None)),
+    Scenario('ordering', 'get', lambda context, number: (
+        reverse('book-list') + '?ordering=title', None)),
+    Scenario('sparse_list', 'get', lambda context, number: (
+        reverse('book-list') + '?fields=id,title', None)),
+    Scenario('filter', 'get', lambda context, number: (
+        reverse('book-list') + '?' + urlencode({
+            'genre__icontains': context.genres[number % len(context.genres)],
+            'publication_date_from': '1950-01-01',
+        }), None)),
+    Scenario('search', 'get', lambda context, number: (
+        reverse('book-list') + '?' + urlencode({'search': TITLE_NOUNS[number % len(TITLE_NOUNS)]}),
+        None)),
+    Scenario('detail', 'get', lambda context, number: (
+        reverse('book-detail', args=[context.ids[number % len(context.ids)]]), None)),
+    Scenario('by_author', 'get', lambda context, number: (
+        reverse('book-by-author', args=[context.authors[number % len(context.authors)]]), None)),
+    Scenario('create', 'post', lambda context, number: (reverse('book-list'), {
+        'title': f'Benchmark Book {number}',
+        'author': context.authors[number % len(context.authors)],
+        'isbn': isbn_for(context.next_number + number, context.seed),
+        'genre': context.genres[number % len(context.genres)],
+        'description': 'Created by the API benchmark.',
+    })),
+    Scenario('update_by_author', 'patch', lambda context, number: (
+        reverse('book-update-by-author'), {
+            'author': context.authors[number % len(context.authors)],
+            'update_data': {'description': f'Revision {number} from the API benchmark.'},
+        })),
+]
+SCENARIO_NAMES = [scenario.name for scenario in SCENARIOS]
+
+BenchmarkContext = namedtuple('BenchmarkContext', 'ids authors genres next_number seed')
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def sample_context(seed=42, sample_size=100):
+    """Pick books, authors and genres to request from the current catalogue."""
+    bounds = Book.objects.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        raise ValueError('The catalogue is empty; seed it before benchmarking.')
+    rng = random.Random(seed)
+    candidates = [rng.randint(bounds['first'], bounds['last']) for _ in range(sample_size)]
+    rows = list(Book.objects.filter(id__in=candidates).values_list('id', 'author', 'genre'))
+    rng.shuffle(rows)
+    return BenchmarkContext(
+        ids=[pk for pk, _, _ in rows],
+        # Sampling books weights authors and genres by catalogue share
+        authors=[author for _, author, _ in rows if author],
+        genres=[genre for _, _, genre in rows if genre] or ['Fiction'],
+        next_number=bounds['last'] + 1,
+        seed=seed,
+    )
+
+
+def run_scenario(client, scenario, context, iterations, warmup=0):
+    """Send ``iterations`` requests for ``scenario``; returns its statistics."""
+    queries = []
+
+    def count_queries(execute, sql, params, many, query_context):
+        queries[-1] += 1
+        return execute(sql, params, many, query_context)
+
+    def send(number):
+        path, data = scenario.request(context, number)
+        if data is None:
+            response = getattr(client, scenario.method)(path)
+        else:
+            response = getattr(client, scenario.method)(path, data, format='json')
+        if response.status_code >= 400:
+            raise RuntimeError(f'{scenario.name}: {scenario.method.upper()} {path} '
+                               f'returned {response.status_code}')
+
+    for number in range(warmup):
+        send(number)
+    latencies = []
+    with connection.execute_wrapper(count_queries):
+        started = time.perf_counter()
+        for number in range(warmup, warmup + iterations):
+            queries.append(0)
+            request_started = time.perf_counter()
+            send(number)
+            latencies.append((time.perf_counter() - request_started) * 1000)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': iterations,
+        'rps': iterations / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.fmean(latencies),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'queries': max(queries),
+    }
+
+
+def run_benchmark(client, scenarios=None, iterations=100, warmup=5, seed=42):
+    """Run the named scenarios (default: all) against the current catalogue."""
+    context = sample_context(seed)
+    selected = [scenario for scenario in SCENARIOS if scenarios is None or scenario.name in scenarios]
+    return {
+        scenario.name: run_scenario(client, scenario, context, iterations, warmup)
+        for scenario in selected
+    }
+
+
+def find_regressions(results, baseline, threshold=0.25):
+    """
+    Compare per-size results with a baseline of the same shape.
+
+    A scenario regresses when its p95 latency grows by more than
+    ``threshold`` or it issues more queries per request than before.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+                regressions.append(
+                    f'{name} @ {size} books: p95 {current["p95_ms"]:.2f} ms '
+                    f'(baseline {previous["p95_ms"]:.2f} ms)'
+                )
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f'{name} @ {size} books: {current["queries"]} queries '
+                    f'(baseline {previous["queries"]})'
+                )
+    return regressions
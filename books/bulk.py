@@ -0,0 +1,216 @@
+"""
+Batched bulk import of books.
+
+Rows are validated in-process, checked for duplicate normalized ISBNs
+with one set-based query per batch and written with ``COPY`` on PostgreSQL or
+``bulk_create`` elsewhere. Model signals are bypassed, so facet counts are
+reported and the response cache invalidated explicitly.
+"""
+import csv
+import io
+import json
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, transaction
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .cache import invalidate_book_cache
+from .facets import apply_facet_deltas, facet_deltas
+from .models import Book, DUPLICATE_ISBN_MESSAGE
+from .validators import to_isbn13, validate_isbn
+
+IMPORT_FIELDS = ['title', 'author', 'isbn', 'publication_date', 'genre', 'description']
+REQUIRED_FIELDS = {'title', 'author'}
+COPY_COLUMNS = IMPORT_FIELDS + ['isbn13', 'created_at', 'updated_at']
+
+BULK_IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+class BulkImportResult:
+    """Running totals and per-row errors of an import."""
+
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'failed': self.failed, 'errors': self.errors}
+
+
+def _max_lengths():
+    return {
+        name: Book._meta.get_field(name).max_length
+        for name in IMPORT_FIELDS
+        if Book._meta.get_field(name).max_length
+    }
+
+
+def clean_row(data, max_lengths):
+    """Validate one input row; return ``(values, errors)``."""
+    if not isinstance(data, dict):
+        return None, {'non_field_errors': ['Expected a JSON object.']}
+
+    values, errors = {}, {}
+    for name in IMPORT_FIELDS:
+        value = data.get(name)
+        value = '' if value is None else str(value).strip()
+        if not value and name in REQUIRED_FIELDS:
+            errors[name] = ['This field is required.']
+        elif name in max_lengths and len(value) > max_lengths[name]:
+            errors[name] = [f'Ensure this field has no more than {max_lengths[name]} characters.']
+        values[name] = value
+
+    values['isbn13'] = ''
+    if values['isbn']:
+        try:
+            validate_isbn(values['isbn'])
+            values['isbn13'] = to_isbn13(values['isbn'])
+        except ValidationError as e:
+            errors['isbn'] = e.messages
+
+    if values['publication_date']:
+        try:
+            values['publication_date'] = parse_date(values['publication_date'])
+        except ValueError:
+            values['publication_date'] = None
+        if values['publication_date'] is None:
+            errors['publication_date'] = ['Date has wrong format. Use YYYY-MM-DD.']
+    else:
+        values['publication_date'] = None
+
+    return values, errors
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if not isinstance(value, str):
+        value = value.isoformat()
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_rows(rows, connection):
+    """Write validated rows with PostgreSQL ``COPY ... FROM STDIN``."""
+    now = timezone.now()
+    buffer = io.StringIO()
+    for row in rows:
+        line = [row[name] for name in IMPORT_FIELDS] + [row['isbn13'], now, now]
+        buffer.write('\t'.join(_copy_value(value) for value in line))
+        buffer.write('\n')
+
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        quote(Book._meta.db_table), ', '.join(quote(name) for name in COPY_COLUMNS)
+    )
+    with connection.cursor() as cursor:
+        if is_psycopg3:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+
+def write_rows(rows, using):
+    """Insert validated rows and update facet counts in one transaction."""
+    connection = connections[using]
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            copy_rows(rows, connection)
+        else:
+            Book.objects.using(using).bulk_create(
+                [Book(**row) for row in rows], batch_size=BULK_IMPORT_BATCH_SIZE
+            )
+        apply_facet_deltas(
+            facet_deltas((row['author'], row['genre']) for row in rows), using=using
+        )
+        invalidate_book_cache()
+
+
+def import_batch(batch, result, using, max_lengths):
+    """Validate, de-duplicate and write one batch of ``(row number, data)`` pairs."""
+    valid, errors = [], {}
+    for number, data in batch:
+        values, row_errors = clean_row(data, max_lengths)
+        if row_errors:
+            errors[number] = row_errors
+        else:
+            valid.append((number, values))
+
+    isbns = {values['isbn13'] for _, values in valid if values['isbn13']}
+    taken = set(
+        Book.objects.using(using).filter(isbn13__in=isbns).values_list('isbn13', flat=True)
+    ) if isbns else set()
+
+    rows = []
+    for number, values in valid:
+        isbn = values['isbn13']
+        if isbn and isbn in taken:
+            errors[number] = {'isbn': [DUPLICATE_ISBN_MESSAGE]}
+            continue
+        if isbn:
+            taken.add(isbn)
+        rows.append((number, values))
+
+    if rows:
+        try:
+            write_rows([values for _, values in rows], using)
+            result.created += len(rows)
+        except IntegrityError:
+            # A concurrent writer took one of the ISBNs between check and insert
+            for number, _ in rows:
+                errors[number] = {'non_field_errors': ['Batch rejected by a database constraint.']}
+
+    for number in sorted(errors):
+        result.add_error(number, errors[number])
+
+
+def import_books(rows, using='default', batch_size=BULK_IMPORT_BATCH_SIZE, progress=None):
+    """
+    Import an iterable of row dicts; returns a ``BulkImportResult``.
+
+    ``progress`` is called with the running result after every batch.
+    """
+    result = BulkImportResult()
+    max_lengths = _max_lengths()
+    numbered = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            return result
+        import_batch(batch, result, using, max_lengths)
+        if progress:
+            progress(result)
+
+
+def iter_ndjson(lines):
+    """Yield one object per non-blank line; undecodable lines yield None."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def iter_csv(lines):
+    """Yield one dict per CSV record, using the header row for field names."""
+    decoded = (
+        line.decode('utf-8', errors='replace') if isinstance(line, bytes) else line
+        for line in lines
+    )
+    yield from csv.DictReader(decoded)
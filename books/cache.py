@@ -0,0 +1,180 @@
+"""
+Response cache for the book list and detail endpoints.
+
+Rendered JSON responses are cached under a key built from the request path,
+host and normalized query parameters plus a global generation number. Any
+write to ``Book`` bumps the generation, which orphans every cached response
+at once instead of tracking which pages a change affects.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import parse_http_date_safe
+
+from .routers import current_replica
+
+GENERATION_KEY = 'books:generation'
+
+# Part of every response key; bump it when the entry layout changes so old
+# entries are never read back
+ENTRY_FORMAT = 2
+
+# Headers of the rendered response kept with its content; middleware such as
+# compression adds its own headers on a hit as it does on a miss
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Allow')
+
+
+def get_cache():
+    return caches[settings.BOOK_CACHE_ALIAS]
+
+
+def get_generation():
+    """Return the current cache generation, initializing it if missing."""
+    cache = get_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so an evicted counter never reuses old keys
+        cache.add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    """Async variant of ``get_generation``."""
+    cache = get_cache()
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        get_generation()
+
+
+def invalidate_book_cache():
+    """
+    Invalidate every cached book response.
+
+    Bumped immediately and again on commit, so responses cached from
+    pre-commit data by concurrent readers are discarded as well.
+    """
+    bump_generation()
+    transaction.on_commit(bump_generation)
+
+
+def store_timeout():
+    """
+    TTL for a response rendered now.
+
+    A replica may still lag behind the write that bumped the generation, so
+    responses read from one are only kept for the replica stickiness window.
+    """
+    timeout = settings.BOOK_CACHE_TIMEOUT
+    if current_replica() is not None:
+        timeout = min(timeout, settings.DB_REPLICA_STICKY_SECONDS)
+    return timeout
+
+
+def cache_key(request, generation):
+    """Build the cache key for a negotiated DRF request under the given generation."""
+    params = sorted((key, request.GET.getlist(key)) for key in request.GET)
+    # The media type's parameters (e.g. indent=4) change the rendered body
+    fingerprint = repr((request.scheme, request.get_host(), request.path, params,
+                        request.accepted_media_type))
+    digest = hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+    return f'books:v{ENTRY_FORMAT}:{generation}:{digest}'
+
+
+def make_etag(content):
+    return quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest())
+
+
+def cache_entry(response):
+    """The ``(content, headers)`` entry stored for a rendered 200 response."""
+    response['ETag'] = response.get('ETag') or make_etag(response.content)
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    return response.content, headers
+
+
+def hit_response(request, hit):
+    """Build the response for a cache entry, honouring the request's preconditions."""
+    content, headers = hit
+    last_modified = headers.get('Last-Modified')
+    response = get_conditional_response(
+        request, etag=headers['ETag'],
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+    )
+    if response is None:
+        response = HttpResponse(content)
+    for name, value in headers.items():
+        # A 304 carries the validators and Vary but no body headers
+        if response.status_code == 200 or name != 'Content-Type':
+            response[name] = value
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+async def acached_response(request, handler):
+    """
+    Async counterpart of ``CachedResponseMixin.cached_response``.
+
+    ``request`` is the view's negotiated DRF request; ``handler`` is a
+    coroutine function returning a rendered JSON response.
+    """
+    timeout = settings.BOOK_CACHE_TIMEOUT
+    if not timeout:
+        return await handler(request)
+
+    cache = get_cache()
+    key = cache_key(request, await aget_generation())
+    hit = await cache.aget(key)
+    if hit is not None:
+        return hit_response(request, hit)
+
+    response = await handler(request)
+    if response.status_code == 200:
+        await cache.aset(key, cache_entry(response), store_timeout())
+        response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedResponseMixin:
+    """Serve ``list`` and ``retrieve`` from the response cache when enabled."""
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        timeout = settings.BOOK_CACHE_TIMEOUT
+        if not timeout or request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = cache_key(request, get_generation())
+        hit = cache.get(key)
+        if hit is not None:
+            return hit_response(request, hit)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = store_timeout()
+
+            def store(rendered):
+                cache.set(key, cache_entry(rendered), timeout)
+            response.add_post_render_callback(store)
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+@register()
+def check_response_cache_backend(app_configs, **kwargs):
+    """Warn when the response cache is on but its invalidation is per-process."""
+    if not settings.BOOK_CACHE_TIMEOUT or not isinstance(caches[settings.BOOK_CACHE_ALIAS], LocMemCache):
+        return []
+    return [Warning(
+        'BOOK_CACHE_TIMEOUT is set but the book cache uses local memory.',
+        hint='Writes only invalidate the cache of the process that made them, so other '
+             'gunicorn workers and the job worker serve stale responses. Set REDIS_URL '
+             'or BOOK_CACHE_TIMEOUT=0 unless a single process serves traffic.',
+        id='books.W001',
+    )]
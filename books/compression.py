@@ -0,0 +1,107 @@
+"""
+Negotiated compression of JSON API responses.
+
+Responses of at least ``COMPRESSION_MIN_BYTES`` are encoded with the codec
+the client prefers among zstd, brotli and gzip (in that order on ties).
+zstd and brotli come from the ``zstandard`` and ``brotli`` requirements;
+an environment without them falls back to gzip. Streaming exports are sent as they are.
+"""
+import gzip
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Available codecs in order of preference; levels favour speed over ratio
+CODECS = {}
+if zstandard is not None:
+    CODECS['zstd'] = lambda content: zstandard.ZstdCompressor(level=3).compress(content)
+if brotli is not None:
+    CODECS['br'] = lambda content: brotli.compress(content, quality=4)
+CODECS['gzip'] = lambda content: gzip.compress(content, compresslevel=6, mtime=0)
+
+
+def parse_accept_encoding(header):
+    """Map each coding of an ``Accept-Encoding`` header to its q-value."""
+    weights = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+def choose_encoding(header):
+    """Return the best available codec the client accepts, or None."""
+    weights = parse_accept_encoding(header)
+    best, best_weight = None, 0.0
+    for coding in CODECS:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def is_compressible(response):
+    if response.streaming or response.has_header('Content-Encoding'):
+        return False
+    media_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    if media_type != 'application/json' and not media_type.endswith('+json'):
+        return False
+    return len(response.content) >= settings.COMPRESSION_MIN_BYTES
+
+
+def compress_response(request, response):
+    """Compress ``response`` in place if it is large JSON and the client accepts it."""
+    if not settings.COMPRESSION_MIN_BYTES or not is_compressible(response):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+
+    compressed = CODECS[encoding](response.content)
+    if len(compressed) >= len(response.content):
+        return response
+    response.content = compressed
+    response['Content-Length'] = str(len(compressed))
+    response['Content-Encoding'] = encoding
+    # The encoded bytes differ, so a strong validator of the identity body
+    # no longer applies (RFC 9110 8.8.3)
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    return response
+
+
+@sync_and_async_middleware
+def compression_middleware(get_response):
+    """Apply ``compress_response`` to every response."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return compress_response(request, await get_response(request))
+    else:
+        def middleware(request):
+            return compress_response(request, get_response(request))
+    return middleware
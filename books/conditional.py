@@ -0,0 +1,73 @@
+"""
+Conditional GET for the book list and detail endpoints.
+
+Validators come from ``Book.updated_at`` rather than the rendered body: a
+detail response is validated by its book's ``updated_at``, a list page by
+the ids and ``updated_at`` of the books on it plus its pagination envelope.
+A request whose ``If-None-Match`` (or, for a detail, ``If-Modified-Since``)
+still matches is answered with 304 before anything is serialized.
+
+List pages only carry an ETag: a book leaving a page can leave the newest
+``updated_at`` on it unchanged, so a ``Last-Modified`` would miss the change.
+"""
+import calendar
+import hashlib
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def version_of(book):
+    """``(id, updated_at)`` of a model instance or a ``values()`` row."""
+    if isinstance(book, dict):
+        return book['id'], book['updated_at']
+    return book.pk, book.updated_at
+
+
+def make_etag(request, books, envelope=None):
+    """ETag of a response showing ``books`` to ``request``."""
+    versions = [version_of(book) for book in books]
+    # The URL covers filters, ordering and ?fields=; the media type the renderer
+    fingerprint = repr((request.accepted_media_type, request.build_absolute_uri(), envelope, versions))
+    return quote_etag(hashlib.md5(fingerprint.encode('utf-8'), usedforsecurity=False).hexdigest())
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(calendar.timegm(last_modified.utctimetuple()))
+    return response
+
+
+def conditional_response(request, etag, last_modified=None):
+    """Return a 304 (or 412) response if the request's preconditions call for one, else None."""
+    timestamp = calendar.timegm(last_modified.utctimetuple()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalResponseMixin:
+    """Answer ``list`` and ``retrieve`` with 304 when the client's copy is current."""
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        books = list(queryset) if page is None else page
+        envelope = None if page is None else self.get_paginated_response([]).data
+        etag = make_etag(request, books, envelope)
+        response = conditional_response(request, etag)
+        if response is None:
+            data = self.get_serializer(books, many=True).data
+            response = Response(data) if page is None else self.get_paginated_response(data)
+        return set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        book = self.get_object()
+        etag = make_etag(request, [book])
+        response = conditional_response(request, etag, book.updated_at)
+        if response is None:
+            response = Response(self.get_serializer(book).data)
+        return set_validators(response, etag, book.updated_at)
@@ -0,0 +1,60 @@
+"""
+Streaming catalogue export.
+
+Rows are read with a server-side cursor (``QuerySet.iterator``) and encoded
+in chunks, so memory stays flat regardless of how many books are exported.
+"""
+import csv
+import json
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(queryset, converters, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield API representations of ``queryset`` rows.
+
+    ``converters`` comes from ``books.serializers.row_converters``.
+    """
+    sources = [source for _, source, _ in converters]
+    for values in queryset.values_list(*sources).iterator(chunk_size=chunk_size):
+        yield {
+            name: value if convert is None or value is None else convert(value)
+            for (name, _, convert), value in zip(converters, values)
+        }
+
+
+def _chunked(lines, size):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
+
+
+def stream_ndjson(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """Encode rows as newline-delimited JSON, yielded in chunks of lines."""
+    lines = (json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n' for row in rows)
+    return _chunked(lines, chunk_size)
+
+
+def stream_csv(rows, fieldnames, chunk_size=EXPORT_CHUNK_SIZE):
+    """Encode rows as CSV with a header line, yielded in chunks of lines."""
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(fieldnames)
+        for row in rows:
+            yield writer.writerow([row[name] for name in fieldnames])
+
+    return _chunked(lines(), chunk_size)
@@ -0,0 +1,99 @@
+"""
+Incremental maintenance of the ``BookFacet`` author/genre counts.
+
+Single-row writes are tracked through model signals (see ``books.signals``).
+Code paths that bypass signals - ``QuerySet.update()``, ``bulk_create`` or
+``COPY`` - must report their changes with ``apply_facet_deltas``.
+"""
+from collections import Counter
+
+from django.db import connections, router, transaction
+from django.db.models import Count
+
+from .models import Book, BookFacet
+
+FACET_FIELDS = {BookFacet.AUTHOR: 'author', BookFacet.GENRE: 'genre'}
+
+# Most facet keys per upsert statement where the backend has no parameter limit
+MAX_UPSERT_KEYS = 10000
+
+
+def facet_keys(author, genre):
+    """Return the ``(kind, value)`` facet keys a book with these values counts towards."""
+    keys = []
+    if author:
+        keys.append((BookFacet.AUTHOR, author))
+    if genre:
+        keys.append((BookFacet.GENRE, genre))
+    return keys
+
+
+def facet_deltas(rows, sign=1):
+    """Count facet keys over ``(author, genre)`` pairs, multiplied by ``sign``."""
+    deltas = Counter()
+    for author, genre in rows:
+        for key in facet_keys(author, genre):
+            deltas[key] += sign
+    return deltas
+
+
+def apply_facet_deltas(deltas, using=None):
+    """
+    Add ``deltas`` (a mapping of ``(kind, value)`` to int) to the stored counts.
+
+    Every key is upserted by one ``INSERT ... ON CONFLICT DO UPDATE`` (split
+    only where the backend limits query parameters), then one ``DELETE``
+    drops the facets whose count fell to zero. Call it inside the
+    transaction of the book write it accounts for.
+    """
+    # Sorted so concurrent writers lock facet rows in the same order
+    deltas = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not deltas:
+        return
+    using = using or router.db_for_write(BookFacet)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table, count = quote(BookFacet._meta.db_table), quote('count')
+    max_params = connection.features.max_query_params
+    chunk_size = min(MAX_UPSERT_KEYS, max_params // 3) if max_params else MAX_UPSERT_KEYS
+
+    with transaction.atomic(using=using, savepoint=False), connection.cursor() as cursor:
+        for start in range(0, len(deltas), chunk_size):
+            chunk = deltas[start:start + chunk_size]
+            cursor.execute(
+                f'INSERT INTO {table} ({quote("kind")}, {quote("value")}, {count}) '
+                f'VALUES {", ".join(["(%s, %s, %s)"] * len(chunk))} '
+                f'ON CONFLICT ({quote("kind")}, {quote("value")}) '
+                f'DO UPDATE SET {count} = {table}.{count} + EXCLUDED.{count}',
+                [param for (kind, value), delta in chunk for param in (kind, value, delta)],
+            )
+        # A negative delta for a missing key inserts a negative count; both go here
+        shrunk = {kind for (kind, _), delta in deltas if delta < 0}
+        if shrunk:
+            BookFacet.objects.using(using).filter(kind__in=shrunk, count__lte=0).delete()
+
+
+def genre_change_deltas(queryset, genre):
+    """Return deltas for setting ``genre`` on every book in ``queryset``."""
+    deltas = Counter()
+    for row in queryset.order_by().values('genre').annotate(n=Count('id')):
+        if row['genre'] == genre:
+            continue
+        if row['genre']:
+            deltas[(BookFacet.GENRE, row['genre'])] -= row['n']
+        if genre:
+            deltas[(BookFacet.GENRE, genre)] += row['n']
+    return deltas
+
+
+def rebuild_facets(using=None):
+    """Recompute every facet count from the ``Book`` table."""
+    books = Book.objects.using(using).order_by()
+    with transaction.atomic(using=using):
+        BookFacet.objects.using(using).all().delete()
+        for kind, field in FACET_FIELDS.items():
+            BookFacet.objects.using(using).bulk_create(
+                (BookFacet(kind=kind, value=row[field], count=row['n'])
+                 for row in books.exclude(**{field: ''}).values(field).annotate(n=Count('id'))),
+                batch_size=1000,
+            )
@@ -1,12 +1,25 @@
 from django_filters import rest_framework as filters
+from django.core.exceptions import ValidationError
 from .models import Book
+from .validators import to_isbn13, validate_isbn
 
 
 class BookFilterSet(filters.FilterSet):
+    author = filters.CharFilter(field_name='author', lookup_expr='icontains')
+    isbn = filters.CharFilter(method='filter_isbn')
+    genre = filters.CharFilter(field_name='genre')
     genre__icontains = filters.CharFilter(field_name='genre', lookup_expr='icontains')
     publication_date_from = filters.DateFilter(field_name='publication_date', lookup_expr='gte')
     publication_date_to = filters.DateFilter(field_name='publication_date', lookup_expr='lte')
 
     class Meta:
         model = Book
-        fields = ['genre__icontains', 'publication_date_from', 'publication_date_to']
+        fields = ['author', 'isbn', 'genre', 'genre__icontains', 'publication_date_from', 'publication_date_to']
+
+    def filter_isbn(self, queryset, name, value):
+        """Exact lookup on the normalized ISBN-13, accepting any ISBN form."""
+        try:
+            validate_isbn(value)
+        except ValidationError:
+            return queryset.none()
+        return queryset.filter(isbn13=to_isbn13(value))
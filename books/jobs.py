@@ -0,0 +1,113 @@
+"""
+Database-backed queue for bulk updates that are too large for one request.
+
+``enqueue_update_job`` stores the request; a worker (``process_book_jobs``)
+claims jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` and applies them in
+primary-key ordered chunks, one short transaction each. Progress is committed
+with every chunk, so locks are held briefly and a job whose worker died is
+picked up again from its last committed chunk.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import invalidate_book_cache
+from .models import Book, BookUpdateJob
+from .updates import clean_update_values, update_books
+
+logger = logging.getLogger(__name__)
+
+UPDATE_JOB_CHUNK_SIZE = 5000
+
+# A running job without a heartbeat for this long is considered abandoned
+STALE_JOB_TIMEOUT = timedelta(minutes=5)
+
+
+def enqueue_update_job(author, update_data):
+    """Validate ``update_data`` and queue a job; raises ``ValidationError``."""
+    clean_update_values(update_data)
+    return BookUpdateJob.objects.create(author=author, update_data=update_data)
+
+
+def claim_job():
+    """Mark the oldest runnable job as running and return it, or None."""
+    stale = timezone.now() - STALE_JOB_TIMEOUT
+    runnable = BookUpdateJob.objects.filter(
+        Q(status=BookUpdateJob.PENDING)
+        | Q(status=BookUpdateJob.RUNNING, heartbeat_at__lt=stale)
+    ).order_by('created_at')
+    with transaction.atomic():
+        job = runnable.select_for_update(skip_locked=True).first()
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = BookUpdateJob.RUNNING
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def process_job(job, chunk_size=UPDATE_JOB_CHUNK_SIZE):
+    """
+    Apply a claimed job chunk by chunk, committing progress with each one.
+
+    Errors mark the job as failed; chunks committed before stay applied.
+    """
+    books = Book.objects.filter(author__icontains=job.author)
+    if job.total is None:
+        job.total = books.count()
+        job.save(update_fields=['total'])
+
+    try:
+        while True:
+            bounds = list(
+                books.filter(pk__gt=job.last_pk).order_by('pk')
+                .values_list('pk', flat=True)[chunk_size - 1:chunk_size]
+            )
+            upper = bounds[0] if bounds else None
+            chunk = books.filter(pk__gt=job.last_pk)
+            if upper is not None:
+                chunk = chunk.filter(pk__lte=upper)
+            with transaction.atomic():
+                count, _ = update_books(chunk, job.update_data, ['id'], limit=0)
+                if count:
+                    invalidate_book_cache()
+                    job.updated += count
+                job.last_pk = upper or job.last_pk
+                job.heartbeat_at = timezone.now()
+                if upper is None:
+                    job.status = BookUpdateJob.DONE
+                    job.finished_at = job.heartbeat_at
+                job.save(update_fields=['updated', 'last_pk', 'heartbeat_at', 'status', 'finished_at'])
+            if upper is None:
+                return job
+    except Exception as e:
+        logger.exception('Book update job %s failed', job.pk)
+        job.status = BookUpdateJob.FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job
+
+
+def run_jobs(chunk_size=UPDATE_JOB_CHUNK_SIZE, once=False, poll_interval=1.0):
+    """
+    Process queued jobs until the queue is empty (``once``) or forever.
+
+    Returns the number of jobs processed.
+    """
+    processed = 0
+    while True:
+        job = claim_job()
+        if job is None:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        process_job(job, chunk_size)
+        processed += 1
@@ -0,0 +1,94 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from rest_framework.test import APIClient
+from books.benchmarks import SCENARIO_NAMES, find_regressions, run_benchmark
+
+COLUMNS = ('req/s', 'mean', 'p50', 'p95', 'p99', 'queries')
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the book API in-process on seeded catalogues of the given sizes '
+            'and compare the results with a saved baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, action='append', dest='sizes',
+                            help='Catalogue size to seed and benchmark, repeatable (default: 1000 and 10000)')
+        parser.add_argument('--scenario', choices=SCENARIO_NAMES, action='append', dest='scenarios',
+                            help='Scenario to run, repeatable (default: all)')
+        parser.add_argument('--iterations', type=int, default=100, help='Measured requests per scenario')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the catalogue and request mix')
+        parser.add_argument('--cache', action='store_true',
+                            help='Keep the response cache on (default: off, so every request hits the database)')
+        parser.add_argument('--save', metavar='PATH', help='Write the results to a JSON baseline file')
+        parser.add_argument('--compare', metavar='PATH', help='Compare with a saved baseline file')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Allowed p95 slowdown against the baseline (default: 0.25 = 25%%)')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database between runs')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)['results']
+
+        overrides = {'BOOK_READ_REPLICAS': []}
+        if not options['cache']:
+            overrides['BOOK_CACHE_TIMEOUT'] = 0
+
+        # Seed and measure in a throwaway database, never the configured one
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options['keepdb'])
+        try:
+            with override_settings(**overrides):
+                results = {
+                    str(size): self.benchmark_size(size, options)
+                    for size in options['sizes'] or [1000, 10000]
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['save']:
+            with open(options['save'], 'w') as f:
+                json.dump({
+                    'vendor': connection.vendor,
+                    'iterations': options['iterations'],
+                    'seed': options['seed'],
+                    'results': results,
+                }, f, indent=2)
+            self.stdout.write(f'Saved results to {options["save"]}')
+
+        if baseline is not None:
+            regressions = find_regressions(results, baseline, options['threshold'])
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f'Regression: {regression}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
+
+    def benchmark_size(self, size, options):
+        self.stdout.write(f'Seeding {size:,} books...')
+        call_command('populate_books', count=size, seed=options['seed'], stdout=StringIO())
+        try:
+            results = run_benchmark(
+                APIClient(), scenarios=options['scenarios'], iterations=options['iterations'],
+                warmup=options['warmup'], seed=options['seed'],
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'{"scenario":<18}' + ''.join(f'{column:>10}' for column in COLUMNS)
+                          + '   (latency in ms)')
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<18}{stats["rps"]:>10,.1f}{stats["mean_ms"]:>10.2f}{stats["p50_ms"]:>10.2f}'
+                f'{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f}{stats["queries"]:>10}'
+            )
+        return results
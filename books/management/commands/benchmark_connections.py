@@ -0,0 +1,85 @@
+import copy
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from books.models import Book
+from books.benchmarks import percentile
+
+MODES = ['new', 'persistent', 'pool']
+
+
+class Command(BaseCommand):
+    help = ('Compare per-request database latency with new connections, persistent '
+            'connections (CONN_MAX_AGE) and the psycopg 3 pool')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=MODES, action='append', dest='modes',
+                            help='Connection mode to run, repeatable (default: all)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent request threads')
+        parser.add_argument('--requests', type=int, default=2000, help='Simulated requests per mode')
+        parser.add_argument('--pool-size', type=int, default=8, help='Pool max_size for the pool mode')
+
+    def database_settings(self, mode, pool_size):
+        config = copy.deepcopy(connections.settings['default'])
+        options = config['OPTIONS']
+        options.pop('pool', None)
+        config['CONN_MAX_AGE'] = 60 if mode == 'persistent' else 0
+        if mode == 'pool':
+            options['pool'] = {'min_size': min(2, pool_size), 'max_size': pool_size, 'timeout': 30}
+        return config
+
+    def run_mode(self, mode, options):
+        alias = f'benchmark_{mode}'
+        connections.settings[alias] = self.database_settings(mode, options['pool_size'])
+        latencies, lock = [], threading.Lock()
+        per_thread = max(1, options['requests'] // options['concurrency'])
+
+        def client():
+            connection = connections[alias]
+            timings = []
+            try:
+                for _ in range(per_thread):
+                    # One request cycle: query, then what request_finished does
+                    started = time.perf_counter()
+                    list(Book.objects.using(alias).order_by('-created_at')
+                         .values_list('id', flat=True)[:10])
+                    connection.close_if_unusable_or_obsolete()
+                    timings.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+            with lock:
+                latencies.extend(timings)
+
+        threads = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if mode == 'pool':
+                connections[alias].close_pool()
+            del connections.settings[alias]
+        return time.perf_counter() - started, sorted(value * 1000 for value in latencies)
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError('This benchmark needs the PostgreSQL database.')
+        modes = options['modes'] or MODES
+        if 'pool' in modes and not is_psycopg3:
+            self.stderr.write('Skipping pool mode: it requires psycopg 3.')
+            modes = [mode for mode in modes if mode != 'pool']
+
+        self.stdout.write(f'{options["requests"]} requests per mode, {options["concurrency"]} threads')
+        for mode in modes:
+            elapsed, ms = self.run_mode(mode, options)
+            self.stdout.write(
+                f'{mode:>10}: {len(ms) / elapsed:8,.0f} req/s | mean {statistics.fmean(ms):6.2f} ms, '
+                f'p50 {percentile(ms, 0.50):6.2f}, p95 {percentile(ms, 0.95):6.2f}, '
+                f'p99 {percentile(ms, 0.99):6.2f}'
+            )
@@ -0,0 +1,67 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from books.benchmarks import percentile
+
+DEFAULT_PATHS = ['/books/', '/books/?search=river', '/books/by-author/woolf/']
+
+
+class Command(BaseCommand):
+    help = 'Measure concurrent request throughput and latency against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000',
+                            help='Server to benchmark')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help=f'Path to request, repeatable (default: {", ".join(DEFAULT_PATHS)})')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=2000, help='Total requests to send')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        urls = [base_url + path for path in options['paths'] or DEFAULT_PATHS]
+        timeout = options['timeout']
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def send(number):
+            url = urls[number % len(urls)]
+            started = time.perf_counter()
+            try:
+                with urlopen(url, timeout=timeout) as response:
+                    response.read()
+            except (HTTPError, URLError, OSError) as e:
+                with lock:
+                    errors.append(f'{url}: {e}')
+                return
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+        try:
+            urlopen(urls[0], timeout=timeout).read()
+        except (URLError, OSError) as e:
+            raise CommandError(f'Server not reachable at {urls[0]}: {e}')
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(send, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        ms = [value * 1000 for value in latencies]
+        self.stdout.write(f'{len(latencies)} ok, {len(errors)} failed in {elapsed:.2f} s '
+                          f'with {options["concurrency"]} clients')
+        self.stdout.write(f'Throughput: {len(latencies) / elapsed:,.1f} req/s')
+        if ms:
+            self.stdout.write(
+                f'Latency ms: mean {statistics.fmean(ms):.1f}, p50 {percentile(ms, 0.50):.1f}, '
+                f'p95 {percentile(ms, 0.95):.1f}, p99 {percentile(ms, 0.99):.1f}, max {ms[-1]:.1f}'
+            )
+        for error in errors[:5]:
+            self.stderr.write(error)
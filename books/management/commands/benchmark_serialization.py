@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from books.models import Book
+from books.serializers import BookListSerializer
+from books.synthetic import generate_books
+
+
+class Command(BaseCommand):
+    help = 'Compare model-instance and values() list serialization (CPU only, no database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=200, help='Pages to render per path')
+
+    def handle(self, *args, **options):
+        fields = BookListSerializer.Meta.fields
+        now = timezone.now()
+        rows = []
+        for pk, data in enumerate(generate_books(options['rows']), start=1):
+            data.update(id=pk, created_at=now)
+            rows.append({name: data[name] for name in fields})
+        instances = [Book(**row) for row in rows]
+
+        renderer = JSONRenderer()
+        results = {}
+        for label, page in [('model instances', instances), ('values() rows', rows)]:
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                content = renderer.render(BookListSerializer(page, many=True).data)
+            elapsed = time.perf_counter() - started
+            results[label] = content
+            self.stdout.write(
+                f'{label:>16}: {elapsed / options["repeat"] * 1000:.3f} ms/page '
+                f'({options["rows"] * options["repeat"] / elapsed:,.0f} rows/s)'
+            )
+
+        identical = len(set(results.values())) == 1
+        style = self.style.SUCCESS if identical else self.style.ERROR
+        self.stdout.write(style(f'Output byte-identical: {identical}'))
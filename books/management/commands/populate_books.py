@@ -1,14 +1,88 @@
+import time
+
 from django.core.management.base import BaseCommand
-from books.models import Book
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from books.bulk import BULK_IMPORT_BATCH_SIZE, import_books
+from books.cache import invalidate_book_cache
+from books.models import Book, BookFacet
+from books.synthetic import GENRES, generate_books
 
 
 class Command(BaseCommand):
-    help = 'Populate the database with famous books'
+    help = (
+        'Populate the database with famous books, or with --count synthetic '
+        'books for load testing'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=0,
+                            help='Generate this many synthetic books instead of the famous ones')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Random seed; the same seed yields the same catalogue')
+        parser.add_argument('--authors', type=int, default=None,
+                            help='Number of distinct authors (default: count / 20)')
+        parser.add_argument('--genres', type=int, default=len(GENRES),
+                            help='Number of distinct genres')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Zipf exponent for author/genre popularity (0 = uniform)')
+        parser.add_argument('--batch-size', type=int, default=BULK_IMPORT_BATCH_SIZE,
+                            help='Rows per COPY/bulk_create batch')
+        parser.add_argument('--append', action='store_true',
+                            help='Keep existing books instead of clearing the table')
 
     def handle(self, *args, **options):
-        # Clear existing books
-        Book.objects.all().delete()
+        start = 0
+        if options['append']:
+            # Continue ISBN sequence numbers past every id handed out so far
+            start = Book.objects.aggregate(last=Max('id'))['last'] or 0
+        else:
+            self.clear_books()
+
+        if options['count'] > 0:
+            count = options['count']
+            rows = generate_books(
+                count,
+                seed=options['seed'],
+                author_count=options['authors'] or max(10, count // 20),
+                genre_count=options['genres'],
+                skew=options['skew'],
+                start=start,
+            )
+        else:
+            count = None
+            rows = self.famous_books()
+
+        started = time.monotonic()
+
+        def report(result):
+            elapsed = time.monotonic() - started
+            done = result.created + result.failed
+            total = f'/{count}' if count else ''
+            self.stdout.write(
+                f'{done}{total} rows processed, {result.created} created '
+                f'({done / elapsed if elapsed else 0:,.0f} rows/s)'
+            )
+
+        result = import_books(rows, batch_size=options['batch_size'], progress=report)
+
+        for error in result.errors:
+            self.stdout.write(
+                self.style.ERROR(f"Error in row {error['row']}: {error['errors']}")
+            )
         
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully created {result.created} books!')
+        )
+
+    def clear_books(self):
+        """Empty the book and facet tables without loading rows into memory."""
+        tables = [Book._meta.db_table, BookFacet._meta.db_table]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables))
+        invalidate_book_cache()
+
+    def famous_books(self):
         famous_books = [
             # J.K. Rowling - Harry Potter Series
             {
@@ -438,18 +512,4 @@ class Command(BaseCommand):
                 'description': 'Randle McMurphy, a new patient at a mental institution, clashes with the oppressive Nurse Ratched in this critique of institutional authority.'
             },
         ]
-        
-        created_count = 0
-        for book_data in famous_books:
-            try:
-                book = Book.objects.create(**book_data)
-                created_count += 1
-                self.stdout.write(f"Created: {book.title} by {book.author}")
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f"Error creating {book_data['title']}: {str(e)}")
-                )
-        
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully created {created_count} books!')
-        )
+        return famous_books
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from books.jobs import UPDATE_JOB_CHUNK_SIZE, run_jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued bulk update jobs in chunked transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling')
+        parser.add_argument('--chunk-size', type=int, default=UPDATE_JOB_CHUNK_SIZE,
+                            help='Books updated per transaction')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait between polls of an empty queue')
+
+    def handle(self, *args, **options):
+        processed = run_jobs(
+            chunk_size=options['chunk_size'], once=options['once'],
+            poll_interval=options['poll_interval'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
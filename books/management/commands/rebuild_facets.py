@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from books.facets import rebuild_facets
+from books.models import BookFacet
+
+
+class Command(BaseCommand):
+    help = 'Recompute the author and genre facet counts from the books table'
+
+    def handle(self, *args, **options):
+        rebuild_facets()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {BookFacet.objects.count()} facets')
+        )
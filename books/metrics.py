@@ -0,0 +1,169 @@
+"""
+Per-request timing and SQL instrumentation.
+
+``RequestMetricsMiddleware`` measures wall time, time spent in SQL, the
+number of queries and the response size of every request. It reports them
+in a ``Server-Timing`` header, logs slow requests and queries, and feeds
+in-process histograms that ``metrics_view`` renders in the Prometheus text
+format. Each server process keeps its own histograms, so scrape every worker
+(or run a single worker per container) to aggregate.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1000, 10000, 100000, 1000000, 10000000)
+
+LABEL_NAMES = ('method', 'view', 'status')
+
+
+class Histogram:
+    """Cumulative Prometheus histogram keyed by label values."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self.lock:
+            counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[labels] = (counts, total + value)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self.series.items())
+        for labels, counts, total in series:
+            label_text = ','.join(f'{name}="{value}"' for name, value in zip(LABEL_NAMES, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Wall time spent handling requests.', DURATION_BUCKETS)
+DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in SQL queries per request.', DURATION_BUCKETS)
+DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries executed per request.', QUERY_COUNT_BUCKETS)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Serialized response body size.', SIZE_BUCKETS)
+HISTOGRAMS = [REQUEST_DURATION, DB_DURATION, DB_QUERIES, RESPONSE_SIZE]
+
+
+class QueryTimer:
+    """Accumulates the SQL time and query count of one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# Timer of the request being handled in this context
+_current_timer = ContextVar('request_query_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    """Database ``execute_wrapper`` feeding the current request's timer."""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        timer.count += 1
+        timer.duration += elapsed
+        if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            logger.warning('Slow query (%.1f ms) on %s: %.1000s',
+                           elapsed * 1000, context['connection'].alias, sql)
+
+
+def install_query_timer(connection, **kwargs):
+    """Add ``time_query`` to a connection once; also a ``connection_created`` receiver."""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class RequestMetricsMiddleware:
+    """Record request timings and SQL usage; opt in with ``REQUEST_METRICS``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before metrics were enabled lack the wrapper
+        for alias in connections:
+            install_query_timer(connections[alias])
+        timer, started = QueryTimer(), time.perf_counter()
+        token = _current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, timer, started)
+
+    async def __acall__(self, request):
+        # ORM calls run in worker threads that inherit this context
+        timer, started = QueryTimer(), time.perf_counter()
+        token = _current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, timer, started)
+
+    def finish(self, request, response, timer, started):
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        labels = (request.method, match.view_name if match else 'unmatched', str(response.status_code))
+        REQUEST_DURATION.observe(labels, elapsed)
+        DB_DURATION.observe(labels, timer.duration)
+        DB_QUERIES.observe(labels, timer.count)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(labels, len(response.content))
+
+        response['Server-Timing'] = (
+            f'total;dur={elapsed * 1000:.1f}, '
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+        )
+        if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            logger.warning('Slow request (%.1f ms, %d queries, %.1f ms SQL): %s %s',
+                           elapsed * 1000, timer.count, timer.duration * 1000,
+                           request.method, request.get_full_path())
+        return response
+
+
+def metrics_view(request):
+    """Prometheus text exposition of the request histograms."""
+    if not settings.REQUEST_METRICS:
+        raise Http404('Request metrics are disabled')
+    body = '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from django.utils.decorators import sync_and_async_middleware
+
+from .routers import choose_replica, reset_replica, use_replica
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Set after a client's write so its next reads go to the primary
+PRIMARY_COOKIE = 'books_primary'
+
+
+def read_only(view):
+    """
+    Mark a view, or a viewset action, whose unsafe-method requests only read.
+
+    Such requests are routed like safe ones and do not pin the client to the
+    primary, e.g. a POST that carries lookup keys in its body.
+    """
+    view.read_only = True
+    return view
+
+
+def _is_read_only(request):
+    if request.method in SAFE_METHODS:
+        return True
+    try:
+        match = resolve(request.path_info, getattr(request, 'urlconf', None))
+    except Resolver404:
+        return False
+    view = match.func
+    # Viewset routes resolve to one function per route; find the action
+    actions = getattr(view, 'actions', None)
+    if actions is not None:
+        view = getattr(view.cls, actions.get(request.method.lower(), ''), None)
+    return getattr(view, 'read_only', False)
+
+
+def _replica_for(request, reads_only):
+    if not reads_only or request.COOKIES.get(PRIMARY_COOKIE):
+        return None
+    return choose_replica()
+
+
+def _mark_writer(request, response, reads_only):
+    if not reads_only and response.status_code < 400:
+        response.set_cookie(
+            PRIMARY_COOKIE, '1', max_age=settings.DB_REPLICA_STICKY_SECONDS,
+            httponly=True, samesite='Lax',
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    """
+    Serve safe requests from a read replica, with read-your-writes stickiness.
+
+    Views marked ``read_only`` count as safe whatever their method. A
+    successful write sets a short-lived cookie; while it is present the
+    client's reads go to the primary, so it never reads data older than its
+    own last write from a lagging replica.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            reads_only = _is_read_only(request)
+            token = use_replica(_replica_for(request, reads_only))
+            try:
+                response = await get_response(request)
+            finally:
+                reset_replica(token)
+            return _mark_writer(request, response, reads_only)
+    else:
+        def middleware(request):
+            reads_only = _is_read_only(request)
+            token = use_replica(_replica_for(request, reads_only))
+            try:
+                response = get_response(request)
+            finally:
+                reset_replica(token)
+            return _mark_writer(request, response, reads_only)
+    return middleware
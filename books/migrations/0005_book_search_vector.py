@@ -0,0 +1,60 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:37
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('english', coalesce({row}title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}author, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce({row}description, '')), 'C')
+"""
+
+CREATE_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION books_book_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR_SQL.format(row='NEW.')};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER books_book_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, author, description ON books_book
+    FOR EACH ROW EXECUTE FUNCTION books_book_search_vector_update();
+    """,
+    f"UPDATE books_book SET search_vector = {SEARCH_VECTOR_SQL.format(row='')};",
+    "CREATE INDEX books_book_search_vector_gin ON books_book USING gin (search_vector);",
+]
+
+DROP_SQL = [
+    "DROP INDEX IF EXISTS books_book_search_vector_gin;",
+    "DROP TRIGGER IF EXISTS books_book_search_vector_trigger ON books_book;",
+    "DROP FUNCTION IF EXISTS books_book_search_vector_update();",
+]
+
+
+def run_on_postgresql(statements):
+    """Return a RunPython callable executing ``statements`` on PostgreSQL only."""
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_alter_book_isbn'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_on_postgresql(CREATE_SQL), run_on_postgresql(DROP_SQL)),
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+from books.operations import RunPostgreSQL
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('books', '0005_book_search_vector'),
+    ]
+
+    # icontains compiles to UPPER(col) LIKE UPPER(...) on PostgreSQL, so the
+    # trigram indexes are built on the same expression to stay usable.
+    operations = [
+        TrigramExtension(),
+        RunPostgreSQL(
+            [
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS books_book_author_upper_trgm "
+                "ON books_book USING gin (UPPER(author) gin_trgm_ops);",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS books_book_title_upper_trgm "
+                "ON books_book USING gin (UPPER(title) gin_trgm_ops);",
+            ],
+            reverse_sql=[
+                "DROP INDEX CONCURRENTLY IF EXISTS books_book_author_upper_trgm;",
+                "DROP INDEX CONCURRENTLY IF EXISTS books_book_title_upper_trgm;",
+            ],
+        ),
+    ]
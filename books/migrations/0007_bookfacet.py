@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_facets(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    BookFacet = apps.get_model('books', 'BookFacet')
+    db = schema_editor.connection.alias
+    books = Book.objects.using(db).order_by()
+    for kind in ('author', 'genre'):
+        BookFacet.objects.using(db).bulk_create(
+            (BookFacet(kind=kind, value=row[kind], count=row['n'])
+             for row in books.exclude(**{kind: ''}).values(kind).annotate(n=Count('id'))),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0006_book_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('author', 'Author'), ('genre', 'Genre')], max_length=10)),
+                ('value', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['kind', '-count', 'value'],
+                'indexes': [models.Index(fields=['kind', '-count', 'value'], name='books_bookf_kind_9d94d6_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='unique_book_facet')],
+            },
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_bookfacet'),
+    ]
+
+    operations = [
+        migrations.AlterConstraint(
+            model_name='book',
+            name='unique_non_empty_isbn',
+            constraint=models.UniqueConstraint(condition=models.Q(('isbn__gt', '')), fields=('isbn',), name='unique_non_empty_isbn', violation_error_message='This ISBN already exists.'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:44
+
+import logging
+
+from django.core.exceptions import ValidationError
+from django.db import migrations, models
+from django.db.models import Count
+
+from books.validators import to_isbn13, validate_isbn
+
+BATCH_SIZE = 10000
+
+logger = logging.getLogger(__name__)
+
+
+def populate_isbn13(apps, schema_editor):
+    """
+    Fill isbn13 in primary-key ordered batches, then check for clashes.
+
+    Legacy ISBNs that never passed validation keep an empty isbn13 and are
+    reported instead of aborting the migration.
+    """
+    Book = apps.get_model('books', 'Book')
+    books = Book.objects.using(schema_editor.connection.alias).exclude(isbn='')
+    invalid = []
+    last_pk = 0
+    while True:
+        batch = list(books.filter(pk__gt=last_pk).order_by('pk').only('pk', 'isbn')[:BATCH_SIZE])
+        if not batch:
+            break
+        for book in batch:
+            try:
+                validate_isbn(book.isbn)
+            except ValidationError:
+                invalid.append(book.isbn)
+                continue
+            book.isbn13 = to_isbn13(book.isbn)
+        Book.objects.using(schema_editor.connection.alias).bulk_update(batch, ['isbn13'])
+        last_pk = batch[-1].pk
+
+    if invalid:
+        logger.warning(
+            '%d books have an invalid ISBN and were left without isbn13: %s',
+            len(invalid), ', '.join(invalid[:10]),
+        )
+
+    clashes = list(
+        books.exclude(isbn13='').order_by().values('isbn13').annotate(n=Count('id')).filter(n__gt=1)
+        .values_list('isbn13', flat=True)[:10]
+    )
+    if clashes:
+        raise RuntimeError(
+            'Books share a normalized ISBN and must be de-duplicated before '
+            f'migrating: {", ".join(clashes)}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0008_isbn_violation_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='isbn13',
+            field=models.CharField(blank=True, default='', editable=False, max_length=13),
+        ),
+        migrations.RunPython(populate_isbn13, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(condition=models.Q(('isbn13__gt', '')), fields=('isbn13',), name='unique_non_empty_isbn13', violation_error_message='This ISBN already exists.'),
+        ),
+    ]
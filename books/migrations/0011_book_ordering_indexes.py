@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:12
+
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+from books.operations import ConcurrentAddIndex, ConcurrentRemoveIndex, RunPostgreSQL
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('books', '0010_bookupdatejob'),
+    ]
+
+    # New indexes are built before the ones they replace are dropped, so
+    # the table is never left without an index for these queries.
+    operations = [
+        ConcurrentAddIndex(
+            model_name='book',
+            index=models.Index(Lower('title'), models.F('id'), name='books_book_title_lower_id_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='book',
+            index=models.Index(Lower('author'), models.F('id'), name='books_book_author_lower_id_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_date', 'id'], name='books_book_pub_date_id_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='book',
+            index=models.Index(fields=['created_at', 'id'], name='books_book_created_id_idx'),
+        ),
+        ConcurrentAddIndex(
+            model_name='book',
+            index=models.Index(fields=['genre', 'publication_date'], name='books_book_genre_pub_date_idx'),
+        ),
+        # genre__icontains compiles to UPPER(genre) LIKE, as in 0006
+        RunPostgreSQL(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS books_book_genre_upper_trgm "
+            "ON books_book USING gin (UPPER(genre) gin_trgm_ops);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS books_book_genre_upper_trgm;",
+        ),
+        # author and genre were indexed twice (db_index plus Meta.indexes);
+        # the genre prefix of the (genre, publication_date) index covers genre.
+        migrations.AlterField(
+            model_name='book',
+            name='author',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='genre',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        ConcurrentRemoveIndex(
+            model_name='book',
+            name='books_book_genre_4a7cdf_idx',
+        ),
+    ]
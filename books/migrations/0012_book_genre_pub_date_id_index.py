@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+from books.operations import ConcurrentAddIndex, ConcurrentRemoveIndex
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('books', '0011_book_ordering_indexes'),
+    ]
+
+    # ?genre= lists ordered by publication_date need the id tiebreaker in the
+    # index too, or PostgreSQL sorts every page; built before the old one is dropped.
+    operations = [
+        ConcurrentAddIndex(
+            model_name='book',
+            index=models.Index(fields=['genre', 'publication_date', 'id'], name='books_book_genre_pub_id_idx'),
+        ),
+        ConcurrentRemoveIndex(
+            model_name='book',
+            name='books_book_genre_pub_date_idx',
+        ),
+    ]
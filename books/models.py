@@ -1,55 +1,161 @@
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Lower
 from django.core.exceptions import ValidationError
-import re
-from .constants import ISBN_COMBINED_PATTERN
+from .validators import to_isbn13, validate_isbn
+
+ISBN_CONSTRAINT_NAME = 'unique_non_empty_isbn'
+ISBN13_CONSTRAINT_NAME = 'unique_non_empty_isbn13'
+DUPLICATE_ISBN_MESSAGE = 'This ISBN already exists.'
+
+
+def is_duplicate_isbn_error(error):
+    """Return True if an IntegrityError comes from the ISBN uniqueness constraint."""
+    message = str(error)
+    # PostgreSQL names the constraint; SQLite names the column. Both checks
+    # also match the normalized isbn13 constraint and column.
+    return ISBN_CONSTRAINT_NAME in message or 'books_book.isbn' in message
+
 
 class Book(models.Model):
     """Book model for library management."""
     
     title = models.CharField(max_length=255)
-    author = models.CharField(max_length=255, db_index=True)
+    author = models.CharField(max_length=255)
     isbn = models.CharField(max_length=20, blank=True, default='')
+    # Canonical ISBN-13 derived from ``isbn`` on save, used for exact lookups
+    isbn13 = models.CharField(max_length=13, blank=True, default='', editable=False)
     publication_date = models.DateField(blank=True, null=True)
     description = models.TextField(blank=True)
-    genre = models.CharField(max_length=100, blank=True, db_index=True)
+    genre = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL (see migration 0005)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['author']),
-            models.Index(fields=['genre']),
+            # One index per BookViewSet ordering, ending in the id tiebreaker
+            # (see SortKey); descending orderings scan them backwards.
+            models.Index(Lower('title'), models.F('id'), name='books_book_title_lower_id_idx'),
+            models.Index(Lower('author'), models.F('id'), name='books_book_author_lower_id_idx'),
+            models.Index(fields=['publication_date', 'id'], name='books_book_pub_date_id_idx'),
+            models.Index(fields=['created_at', 'id'], name='books_book_created_id_idx'),
+            models.Index(fields=['genre', 'publication_date', 'id'], name='books_book_genre_pub_id_idx'),
         ]
         constraints = [
             models.UniqueConstraint(
                 fields=['isbn'],
                 condition=models.Q(isbn__gt=''),
-                name='unique_non_empty_isbn'
-            )
+                name=ISBN_CONSTRAINT_NAME,
+                violation_error_message=DUPLICATE_ISBN_MESSAGE,
+            ),
+            models.UniqueConstraint(
+                fields=['isbn13'],
+                condition=models.Q(isbn13__gt=''),
+                name=ISBN13_CONSTRAINT_NAME,
+                violation_error_message=DUPLICATE_ISBN_MESSAGE,
+            ),
         ]
 
     def clean(self):
-        """Custom validation for ISBN format and uniqueness."""
+        """Custom validation for ISBN format."""
         if self.isbn and self.isbn.strip():
-            # Remove formatting
-            clean_isbn = self.isbn.replace('-', '').replace(' ', '').upper()
-            
             # Validate format
-            if not re.fullmatch(ISBN_COMBINED_PATTERN, clean_isbn):
-                raise ValidationError({'isbn': 'ISBN must be 10 or 13 characters (digits or X for ISBN-10).'})
-            
-            # Check X position for ISBN-10
-            if len(clean_isbn) == 10 and 'X' in clean_isbn[:-1]:
-                raise ValidationError({'isbn': "In ISBN-10, 'X' is allowed only as the last character."})
-            
-            # Check uniqueness
-            if Book.objects.filter(isbn=self.isbn).exclude(pk=self.pk).exists():
-                raise ValidationError({'isbn': 'This ISBN already exists.'})
+            try:
+                validate_isbn(self.isbn)
+            except ValidationError as e:
+                raise ValidationError({'isbn': e.messages})
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(*args, **kwargs)
+        """
+        Validate in-process and leave ISBN uniqueness to the database.
+
+        The write itself is the uniqueness check: a violation of the
+        ``unique_non_empty_isbn`` constraint is re-raised as the same
+        ``ValidationError`` callers got from the old pre-insert query.
+        """
+        self.full_clean(validate_unique=False, validate_constraints=False)
+        self.isbn13 = to_isbn13(self.isbn)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'isbn' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'isbn13'}
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        try:
+            # One transaction with the post_save facet update; inside a caller's
+            # transaction the savepoint keeps a duplicate from aborting it
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if is_duplicate_isbn_error(e):
+                raise ValidationError({'isbn': [DUPLICATE_ISBN_MESSAGE]}) from e
+            raise
 
     def __str__(self):
         return f"{self.title} by {self.author}"
+
+
+
+class BookFacet(models.Model):
+    """Precomputed book counts per distinct author and genre.
+
+    Kept up to date incrementally by ``books.facets`` so the facet endpoints
+    never have to aggregate the whole ``Book`` table.
+    """
+
+    AUTHOR = 'author'
+    GENRE = 'genre'
+    KIND_CHOICES = [(AUTHOR, 'Author'), (GENRE, 'Genre')]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    value = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['kind', '-count', 'value']
+        indexes = [
+            models.Index(fields=['kind', '-count', 'value']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='unique_book_facet')
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.value} ({self.count})"
+
+
+class BookUpdateJob(models.Model):
+    """A queued bulk update by author, processed by ``process_book_jobs``.
+
+    Work is committed in primary-key ordered chunks; ``last_pk`` records the
+    end of the last committed chunk so an interrupted job resumes from there.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    author = models.CharField(max_length=255)
+    update_data = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total = models.IntegerField(null=True, blank=True)
+    updated = models.IntegerField(default=0)
+    last_pk = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"Update books by {self.author} ({self.status})"
@@ -0,0 +1,319 @@
+import base64
+import binascii
+import json
+from typing import Any, NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+# Planner row estimate, scaled to the table's current size like the planner does
+TABLE_ESTIMATE_SQL = """
+    SELECT CASE WHEN relpages > 0
+        THEN reltuples / relpages * (pg_relation_size(oid) / current_setting('block_size')::int)
+        ELSE reltuples END
+    FROM pg_class WHERE oid = %s::regclass
+"""
+
+
+def can_estimate(queryset):
+    """Whether ``queryset`` lists a whole table, so its count may be estimated."""
+    query = queryset.query
+    return bool(settings.BOOK_ESTIMATED_COUNT_THRESHOLD) and not (
+        query.where or query.distinct or query.combinator or query.is_sliced
+    )
+
+
+def estimated_count(queryset):
+    """
+    PostgreSQL's estimate of an unfiltered queryset's row count, or None.
+
+    None means an exact ``COUNT(*)`` is needed: the queryset is filtered,
+    the table is below ``BOOK_ESTIMATED_COUNT_THRESHOLD`` rows or has never
+    been analyzed, or the database is not PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if not can_estimate(queryset) or connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(TABLE_ESTIMATE_SQL, [connection.ops.quote_name(queryset.model._meta.db_table)])
+        estimate = cursor.fetchone()[0]
+    if estimate is None or estimate < settings.BOOK_ESTIMATED_COUNT_THRESHOLD:
+        return None
+    return int(estimate)
+
+
+class EstimatedCountPage(Page):
+    """Page of an estimated listing; the next page is known from one extra row."""
+
+    def __init__(self, object_list, number, paginator, more):
+        super().__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator that estimates the count of large unfiltered listings.
+
+    An estimate may be low, so it does not bound the page number: an
+    estimated page fetches one row past its end to tell whether a next page
+    exists, and only a page without rows is out of range.
+    """
+
+    count_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None:
+            return self.object_list.count()
+        self.count_estimated = True
+        return estimate
+
+    async def acount(self):
+        """Resolve ``count`` with the async ORM."""
+        if 'count' not in self.__dict__:
+            estimate = None
+            if can_estimate(self.object_list):
+                estimate = await sync_to_async(estimated_count)(self.object_list)
+            if estimate is None:
+                self.count = await self.object_list.acount()
+            else:
+                self.count, self.count_estimated = estimate, True
+        return self.count
+
+    def validate_number(self, number):
+        # Resolve the count first: it decides whether num_pages is a bound
+        self.count
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self.estimated_page(list(self.object_list[bottom:bottom + self.per_page + 1]), number)
+
+    async def apage(self, number):
+        """Async variant of ``page`` with its rows fetched; call ``acount`` first."""
+        number = self.validate_number(number)
+        if self.count_estimated:
+            bottom = (number - 1) * self.per_page
+            rows = self.object_list[bottom:bottom + self.per_page + 1]
+            return self.estimated_page([row async for row in rows.aiterator()], number)
+        page = super().page(number)
+        page.object_list = [row async for row in page.object_list.aiterator()]
+        return page
+
+    def estimated_page(self, rows, number):
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return EstimatedCountPage(rows[:self.per_page], number, self, more=len(rows) > self.per_page)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination that skips ``COUNT(*)`` on large unfiltered lists.
+
+    An exact count of a big table is a full scan on PostgreSQL, often slower
+    than fetching the page itself, so whole-table listings report the
+    planner's estimate instead. ``count_estimated`` says which was returned.
+    Filtered and small result sets are always counted exactly.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response({
+            'count': paginator.count,
+            'count_estimated': paginator.count_estimated,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_estimated'] = {
+            'type': 'boolean',
+            'description': 'Whether count is the planner estimate rather than an exact count.',
+        }
+        return response_schema
+
+
+class SortKey(NamedTuple):
+    """Column a listing is sorted on, with ``id`` as the tiebreaker."""
+
+    field: str
+    descending: bool = False
+    nullable: bool = False
+    expression: Any = None
+
+    def order_by(self):
+        """Return ``order_by()`` arguments; NULLs always sort as the largest value."""
+        if self.nullable:
+            key = (F(self.field).desc(nulls_first=True) if self.descending
+                   else F(self.field).asc(nulls_last=True))
+        else:
+            key = f'-{self.field}' if self.descending else self.field
+        return [key, '-id' if self.descending else 'id']
+
+    def seek(self, value, pk, backwards=False):
+        """Return a filter selecting rows after ``(value, pk)`` in this ordering."""
+        op = 'gt' if self.descending == backwards else 'lt'
+        field = self.field
+        if value is None:
+            if op == 'gt':
+                return Q(**{f'{field}__isnull': True, f'pk__{op}': pk})
+            return Q(**{f'{field}__isnull': False}) | Q(**{f'{field}__isnull': True, f'pk__{op}': pk})
+        condition = Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+        if op == 'gt' and self.nullable:
+            condition |= Q(**{f'{field}__isnull': True})
+        return condition
+
+
+class BookCursorPagination(BasePagination):
+    """
+    Keyset pagination over the view's sort key.
+
+    Pages are located with a ``(key, id)`` range predicate instead of
+    ``OFFSET`` so deep pages cost the same as the first one and stay stable
+    under concurrent inserts. The total count is only computed on request,
+    and estimated like ``EstimatedCountPagination`` does for large tables.
+    """
+
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.sort_key = view.get_sort_key()
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('true', '1', 'yes'):
+            estimate = estimated_count(queryset)
+            self.count_estimated = estimate is not None
+            self.count = queryset.count() if estimate is None else estimate
+
+        cursor = self.decode_cursor(request)
+        backwards = False
+        if cursor is not None:
+            value, pk, backwards = cursor
+            try:
+                queryset = queryset.filter(self.sort_key.seek(value, pk, backwards))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+            if backwards:
+                queryset = queryset.reverse()
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_paginated_response(self, data):
+        payload = {}
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_estimated'] = self.count_estimated
+        payload['next'] = self.get_next_link()
+        payload['previous'] = self.get_previous_link()
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], backwards=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def encode_cursor(self, row, backwards):
+        # Rows are model instances or QuerySet.values() dicts
+        if isinstance(row, dict):
+            value, pk = row[self.sort_key.field], row['id']
+        else:
+            value, pk = getattr(row, self.sort_key.field), row.pk
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        token = json.dumps([value, pk, backwards], separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            value, pk, backwards = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            if (not isinstance(pk, int) or not isinstance(backwards, bool)
+                    or isinstance(value, (list, dict))):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, backwards
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total result count.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -0,0 +1,62 @@
+"""
+Primary/replica database routing for the book read endpoints.
+
+Reads of books and facets go to a read replica only while a request opted
+in through ``replica_routing_middleware``: a safe (GET/HEAD/OPTIONS) request
+from a client that has not written recently. Everything else - writes, reads
+inside a transaction, management commands and the job worker - uses the
+primary, so code outside the request cycle never sees replication lag.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Models whose reads may be served by a replica
+REPLICA_READ_MODELS = {'books.book', 'books.bookfacet'}
+
+# Replica alias chosen for the current request, or None to use the primary
+_replica = ContextVar('book_read_replica', default=None)
+
+
+def choose_replica():
+    """Pick a configured replica alias, or None when none is configured."""
+    replicas = settings.BOOK_READ_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+def use_replica(alias):
+    """Route this context's eligible reads to ``alias``; returns a reset token."""
+    return _replica.set(alias)
+
+
+def reset_replica(token):
+    _replica.reset(token)
+
+
+def current_replica():
+    """The replica serving this context's reads, or None."""
+    return _replica.get()
+
+
+class PrimaryReplicaRouter:
+    """Send opted-in book reads to a replica and every write to the primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        if alias is None or model._meta.label_lower not in REPLICA_READ_MODELS:
+            return None
+        # Reads inside a transaction must see the transaction's own writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Read your own writes for the rest of the request
+        _replica.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
@@ -1,19 +1,121 @@
-from rest_framework import serializers
-from .models import Book
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from .models import Book, BookUpdateJob
 
 
-class BookSerializer(serializers.ModelSerializer):
+class ModelValidationMixin:
+    """Report model-level ``ValidationError`` from ``save()`` as a 400 response."""
+
+    def create(self, validated_data):
+        try:
+            return super().create(validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
+
+    def update(self, instance, validated_data):
+        try:
+            return super().update(instance, validated_data)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
+
+
+class SparseFieldsMixin:
+    """Accept a ``fields`` argument limiting the serializer to those field names."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class BookSerializer(ModelValidationMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Complete book serializer for detailed operations."""
     
     isbn = serializers.CharField(required=False, allow_blank=True)
     
     class Meta:
         model = Book
-        fields = "__all__"
-        read_only_fields = ["id", "created_at", "updated_at"]
+        exclude = ["search_vector"]
+        read_only_fields = ["id", "isbn13", "created_at", "updated_at"]
+
+
+# Fields whose representation of a database value is the value itself
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField)
+
+
+def is_iso_format(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def iso_datetime_converter(field):
+    """
+    Equivalent of ``DateTimeField.to_representation`` for ISO 8601 output
+    that resolves the current timezone once per page instead of per row.
+    """
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+    def convert(value):
+        if isinstance(value, str):
+            return value
+        if field_timezone is not None and timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = field.enforce_timezone(value)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    return convert
 
 
-class BookListSerializer(serializers.ModelSerializer):
+def row_converters(serializer):
+    """
+    Return ``(name, source, convert)`` for each readable field of ``serializer``.
+
+    ``convert`` is None when the database value is already its representation.
+    Used to serialize ``QuerySet.values()`` rows without model instances.
+    """
+    converters = []
+    for field in serializer._readable_fields:
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            convert = None
+        elif isinstance(field, serializers.DateTimeField) and is_iso_format(field):
+            convert = iso_datetime_converter(field)
+        else:
+            convert = field.to_representation
+        converters.append((field.field_name, field.source, convert))
+    return converters
+
+
+class BookRowListSerializer(serializers.ListSerializer):
+    """
+    List serializer with a fast path for ``QuerySet.values()`` rows.
+
+    Dict rows skip per-field attribute lookup and only run
+    ``to_representation`` for fields that actually transform the value,
+    producing the same output as the regular per-instance path.
+    """
+
+    def to_representation(self, data):
+        rows = list(data)
+        if not rows or not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+
+        converters = row_converters(self.child)
+        output = []
+        for row in rows:
+            item = {}
+            for name, source, convert in converters:
+                value = row[source]
+                item[name] = value if convert is None or value is None else convert(value)
+            output.append(item)
+        return output
+
+
+class BookListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for book listings."""
     
     class Meta:
@@ -22,13 +124,26 @@ class BookListSerializer(serializers.ModelSerializer):
             "id", "title", "author", "isbn", 
             "genre", "publication_date", "created_at"
         ]
+        list_serializer_class = BookRowListSerializer
 
 
-class BookCreateSerializer(serializers.ModelSerializer):
+class BookCreateSerializer(ModelValidationMixin, serializers.ModelSerializer):
     """Serializer for creating books."""
     
     isbn = serializers.CharField(required=False, allow_blank=True)
     
     class Meta:
         model = Book
-        exclude = ["created_at", "updated_at"]
\ No newline at end of file
+        exclude = ["created_at", "updated_at", "search_vector", "isbn13"]
+
+
+class BookUpdateJobSerializer(serializers.ModelSerializer):
+    """Status and progress of a queued bulk update."""
+
+    class Meta:
+        model = BookUpdateJob
+        fields = [
+            "id", "author", "update_data", "status", "total", "updated",
+            "error", "created_at", "started_at", "finished_at"
+        ]
+        read_only_fields = fields
@@ -0,0 +1,50 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_book_cache
+from .facets import apply_facet_deltas, facet_deltas
+from .models import Book
+
+
+def _loaded_facet_values(instance):
+    """Return ``(author, genre)`` as loaded, or None if either field is deferred."""
+    values = instance.__dict__
+    if 'author' not in values or 'genre' not in values:
+        return None
+    return values['author'], values['genre']
+
+
+@receiver(post_init, sender=Book)
+def remember_facet_values(sender, instance, **kwargs):
+    instance._facet_values = _loaded_facet_values(instance)
+
+
+@receiver(post_save, sender=Book)
+def update_facets_on_save(sender, instance, created, using, raw=False, **kwargs):
+    if raw:
+        return
+    current = _loaded_facet_values(instance)
+    previous = None if created else instance._facet_values
+    if not created and previous is None:
+        previous = (
+            Book.objects.using(using).filter(pk=instance.pk)
+            .values_list('author', 'genre').first()
+        )
+    deltas = facet_deltas([current] if current else [])
+    deltas.update(facet_deltas([previous] if previous else [], sign=-1))
+    apply_facet_deltas(deltas, using=using)
+    instance._facet_values = current
+
+
+@receiver(post_delete, sender=Book)
+def update_facets_on_delete(sender, instance, using, **kwargs):
+    values = _loaded_facet_values(instance) or instance._facet_values
+    if values:
+        apply_facet_deltas(facet_deltas([values], sign=-1), using=using)
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_cache_on_write(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_book_cache()
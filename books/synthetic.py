@@ -0,0 +1,112 @@
+"""
+Deterministic synthetic catalogue generator for load testing.
+
+Authors and genres are drawn from a Zipf-like distribution so a few of them
+dominate the catalogue, as in real libraries. ISBNs carry valid check digits
+and are unique per sequence number: ISBN-13s use the 979 prefix, which has
+no ISBN-10 equivalent, so they never collide with the generated ISBN-10s.
+"""
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+from .validators import isbn10_check_digit, isbn13_check_digit
+
+FIRST_NAMES = [
+    'Ada', 'Alan', 'Anna', 'Boris', 'Clara', 'Dmitri', 'Elena', 'Felix', 'Grace', 'Hugo',
+    'Ines', 'Jonas', 'Karin', 'Leo', 'Maya', 'Nikola', 'Olga', 'Pavel', 'Rosa', 'Stefan',
+    'Tara', 'Uma', 'Viktor', 'Wanda', 'Yusuf', 'Zora',
+]
+LAST_NAMES = [
+    'Andric', 'Brontë', 'Calvino', 'Duras', 'Eco', 'Fontane', 'Gogol', 'Hesse', 'Ishiguro',
+    'Joyce', 'Kafka', 'Lessing', 'Mann', 'Nabokov', 'Oz', 'Pamuk', 'Queneau', 'Roth',
+    'Selimovic', 'Tolstoy', 'Undset', 'Vonnegut', 'Woolf', 'Yourcenar', 'Zola',
+]
+GENRES = [
+    'Fiction', 'Fantasy', 'Science Fiction', 'Mystery', 'Thriller', 'Romance', 'Horror',
+    'Historical Fiction', 'Biography', 'History', 'Poetry', 'Drama', 'Philosophy', 'Science',
+    'Travel', 'Self-Help', 'Children', 'Young Adult', 'Classic', 'Dystopian Fiction',
+]
+TITLE_ADJECTIVES = [
+    'Silent', 'Lost', 'Broken', 'Golden', 'Hidden', 'Last', 'Crimson', 'Distant', 'Endless',
+    'Forgotten', 'Iron', 'Quiet', 'Secret', 'Burning', 'Frozen', 'Wandering',
+]
+TITLE_NOUNS = [
+    'River', 'Garden', 'Empire', 'Letter', 'Mountain', 'Kingdom', 'Harbor', 'Winter', 'Machine',
+    'Orchard', 'Shadow', 'Bridge', 'Island', 'Voyage', 'Archive', 'Lantern', 'Storm', 'City',
+]
+DESCRIPTION_TEMPLATES = [
+    'A {adj} tale of a {noun} and the people bound to it.',
+    'An account of the {adj} {noun}, told across three generations.',
+    'When the {noun} falls {adj}, nothing in town stays the same.',
+]
+
+EARLIEST_DATE = date(1900, 1, 1)
+DATE_SPAN_DAYS = (date(2024, 12, 31) - EARLIEST_DATE).days
+
+# Bijective scrambling of sequence numbers into 9-digit ISBN cores
+ISBN_CORE_MODULUS = 10 ** 9
+ISBN_CORE_MULTIPLIER = 387420489  # 3 ** 18, coprime with 10
+
+
+def isbn_for(number, seed, isbn13=True):
+    """Return a valid ISBN that is unique for ``number`` under ``seed``."""
+    core = f'{(number * ISBN_CORE_MULTIPLIER + seed) % ISBN_CORE_MODULUS:09d}'
+    if isbn13:
+        body = f'979{core}'
+        return body + isbn13_check_digit(body)
+    return core + isbn10_check_digit(core)
+
+
+def zipf_cum_weights(size, skew):
+    """Cumulative weights of a Zipf distribution with exponent ``skew``."""
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, size + 1)))
+
+
+def make_authors(count, rng):
+    """Return ``count`` distinct author names."""
+    names = [f'{first} {last}' for last in LAST_NAMES for first in FIRST_NAMES]
+    rng.shuffle(names)
+    return [
+        names[i % len(names)] if i < len(names) else f'{names[i % len(names)]} {i // len(names) + 1}'
+        for i in range(count)
+    ]
+
+
+def make_genres(count):
+    """Return ``count`` genre names, numbering them once the list runs out."""
+    return [
+        GENRES[i % len(GENRES)] if i < len(GENRES) else f'{GENRES[i % len(GENRES)]} {i // len(GENRES) + 1}'
+        for i in range(count)
+    ]
+
+
+def generate_books(count, seed=42, author_count=1000, genre_count=len(GENRES),
+                   skew=1.1, isbn10_ratio=0.2, start=0):
+    """
+    Yield ``count`` book dicts ready for ``books.bulk.import_books``.
+
+    ``start`` offsets the sequence numbers ISBNs are derived from, so appending
+    to an existing catalogue with the same seed does not repeat ISBNs.
+    """
+    rng = random.Random(seed)
+    authors = make_authors(author_count, rng)
+    genres = make_genres(genre_count)
+    author_weights = zipf_cum_weights(len(authors), skew)
+    genre_weights = zipf_cum_weights(len(genres), skew)
+
+    for number in range(start, start + count):
+        adj = rng.choice(TITLE_ADJECTIVES)
+        noun = rng.choice(TITLE_NOUNS)
+        roll = rng.random()
+        yield {
+            'title': f'The {adj} {noun} {number + 1}',
+            'author': rng.choices(authors, cum_weights=author_weights)[0],
+            'isbn': '' if roll < 0.05 else isbn_for(number, seed, isbn13=roll >= isbn10_ratio),
+            'publication_date': (
+                None if roll > 0.97
+                else EARLIEST_DATE + timedelta(days=rng.randrange(DATE_SPAN_DAYS))
+            ),
+            'genre': '' if roll > 0.99 else rng.choices(genres, cum_weights=genre_weights)[0],
+            'description': rng.choice(DESCRIPTION_TEMPLATES).format(adj=adj.lower(), noun=noun.lower()),
+        }
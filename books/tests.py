@@ -1,9 +1,42 @@
-from django.test import TestCase
-from django.urls import reverse
+import csv
+import gzip
+import inspect
+import json
+from io import StringIO
+from unittest import mock
+
+import brotli
+import zstandard
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from django.core.exceptions import ValidationError
-from rest_framework.test import APITestCase
+from django.db.models.functions import Lower
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase
 from rest_framework import status
-from .models import Book
+from .benchmarks import SCENARIO_NAMES, find_regressions, run_benchmark
+from .bulk import import_books
+from .checks import check_response_cache_backend
+from .compression import CODECS, choose_encoding
+from .facets import apply_facet_deltas, rebuild_facets
+from .jobs import enqueue_update_job
+from .metrics import install_query_timer
+from .models import Book, BookFacet, BookUpdateJob
+from .pagination import can_estimate
+from .search import prefix_tsquery
+from .serializers import BookListSerializer
+from .synthetic import generate_books, isbn_for
+from .validators import isbn10_check_digit, isbn13_check_digit, to_isbn13
+from .views import MAX_BATCH_SIZE, BookViewSet
 
 
 class BookModelTest(TestCase):
@@ -44,7 +77,7 @@ class BookModelTest(TestCase):
         """Test that database indexes are properly created."""
         indexes = [idx.fields for idx in Book._meta.indexes]
         self.assertIn(['author'], indexes)
-        self.assertIn(['genre'], indexes)
+        self.assertIn(['genre', 'publication_date', 'id'], indexes)
     
     def test_isbn_validation_in_model(self):
         """Test ISBN validation in model clean method."""
@@ -227,3 +260,1222 @@ class BookAPITest(APITestCase):
                 response = self.client.patch(url, data, format='json')
                 self.assertEqual(response.status_code, expected_status)
                 self.assertIn(error_text, response.data['error'])
+
+    def test_bulk_update_single_statement_and_validation(self):
+        """Test the update runs as one query and values are validated."""
+        url = reverse('book-update-by-author')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'author': 'API Author', 'update_data': {
+                'description': 'New', 'publication_date': '2001-02-03'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([q['sql'].split()[0] for q in queries.captured_queries
+                          if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))], ['UPDATE'])
+        self.assertEqual(response.data['books'][0]['publication_date'], '2001-02-03')
+        self.book.refresh_from_db()
+        self.assertGreater(self.book.updated_at, self.book.created_at)
+
+        for update_data in ({'publication_date': 'soon'}, {'genre': 'x' * 101}):
+            with self.subTest(update_data=update_data):
+                response = self.client.patch(url, {'author': 'API Author', 'update_data': update_data},
+                                             format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertEqual(list(response.data['errors']), list(update_data))
+
+    @override_settings(REST_FRAMEWORK={'PAGE_SIZE': 2})
+    def test_bulk_update_caps_returned_books(self):
+        """Test only the newest page of updated books is returned, with a next link."""
+        for i in range(3):
+            Book.objects.create(title=f'Extra {i}', author='API Author')
+        response = self.client.patch(reverse('book-update-by-author'),
+                                     {'author': 'API Author', 'update_data': {'genre': 'Capped'}},
+                                     format='json')
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(response.data['books']), 2)
+        self.assertIn('author=API+Author', response.data['next'])
+        listed = self.client.get(reverse('book-list'), {'author': 'API Author'}).data['results']
+        self.assertEqual(response.data['books'], listed[:2])
+
+
+class BookUpdateJobTest(APITestCase):
+    """Test queued bulk updates processed in chunks by the worker."""
+
+    def setUp(self):
+        for i in range(5):
+            Book.objects.create(title=f'Job {i}', author='Queued Author', genre='Old')
+        Book.objects.create(title='Other', author='Someone Else', genre='Old')
+        self.url = reverse('book-update-by-author')
+
+    def test_async_update_is_queued_and_processed_in_chunks(self):
+        """Test the endpoint enqueues a job the worker applies in chunks."""
+        response = self.client.patch(self.url, {'author': 'queued', 'async': True,
+                                                'update_data': {'genre': 'New'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(Book.objects.filter(genre='New').count(), 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('process_book_jobs', '--once', '--chunk-size', '2', stdout=StringIO())
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "books_book"') for q in queries.captured_queries), 3)
+
+        job = self.client.get(response['Location']).data
+        self.assertEqual((job['status'], job['total'], job['updated']), ('done', 5, 5))
+        self.assertEqual(Book.objects.filter(genre='New').count(), 5)
+        self.assertEqual(BookFacet.objects.get(kind='genre', value='Old').count, 1)
+
+    def test_async_update_validates_before_queueing(self):
+        """Test invalid values are rejected without creating a job."""
+        response = self.client.patch(self.url, {'author': 'queued', 'async': True,
+                                                'update_data': {'isbn': '123'}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(BookUpdateJob.objects.exists())
+        response = self.client.get(reverse('book-job', kwargs={'job_id': 999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class BookCursorPaginationTest(APITestCase):
+    """Test keyset pagination mode of the list endpoint."""
+
+    def setUp(self):
+        titles = ['delta', 'Alpha', 'charlie', 'Bravo', 'alpha', 'Echo']
+        dates = ['2020-01-01', None, '2019-05-05', None, '2020-01-01', '2018-03-03']
+        for i, (title, date) in enumerate(zip(titles, dates)):
+            Book.objects.create(title=title, author=f'Author {i}', publication_date=date)
+        self.list_url = reverse('book-list')
+
+    def walk(self, ordering, page_size=2):
+        """Follow next links and return ids in traversal order."""
+        ids, pages = [], []
+        response = self.client.get(self.list_url, {
+            'pagination': 'cursor', 'ordering': ordering, 'page_size': page_size
+        })
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            ids.extend(book['id'] for book in response.data['results'])
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_walk_matches_page_number_ordering(self):
+        """Test every supported ordering traverses all rows exactly once."""
+        for ordering in ['title', '-title', 'author', '-author', 'publication_date',
+                         '-publication_date', 'created_at', '-created_at', '']:
+            with self.subTest(ordering=ordering):
+                expected = [book['id'] for book in self.client.get(
+                    self.list_url, {'ordering': ordering}).data['results']]
+                ids, _ = self.walk(ordering)
+                self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        """Test walking back from the last page with previous links."""
+        _, pages = self.walk('title')
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual(response.data['results'], pages[-2]['results'])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_count_only_when_requested(self):
+        """Test total count is skipped unless explicitly requested."""
+        response = self.client.get(self.list_url, {'pagination': 'cursor'})
+        self.assertNotIn('count', response.data)
+        response = self.client.get(self.list_url, {'pagination': 'cursor', 'count': 'true'})
+        self.assertEqual(response.data['count'], 6)
+
+    def test_invalid_cursor_rejected(self):
+        """Test malformed cursors return 404 instead of a server error."""
+        for cursor in ['garbage', 'WyJ4IiwxLHRydWVd']:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.list_url, {'cursor': cursor, 'ordering': 'created_at'})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BookSearchTest(APITestCase):
+    """Test the full-text search backend and its SQLite fallback."""
+
+    def setUp(self):
+        Book.objects.create(title='The Hobbit', author='J.R.R. Tolkien', description='Dragons')
+        Book.objects.create(title='Dune', author='Frank Herbert', description='Spice')
+        self.list_url = reverse('book-list')
+
+    def test_prefix_tsquery_sanitizes_terms(self):
+        """Test prefix queries keep only words and match each as a prefix."""
+        self.assertEqual(prefix_tsquery(['Tol', "hob:*|!"]), "'tol':* & 'hob':*")
+        self.assertEqual(prefix_tsquery(['&|!']), '')
+
+    def test_search_fallback_and_prefix_mode(self):
+        """Test search and type-ahead mode match on the fallback backend."""
+        for params in [{'search': 'tolkien'}, {'search': 'Tol', 'search_mode': 'prefix'}]:
+            with self.subTest(params=params):
+                response = self.client.get(self.list_url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual([b['title'] for b in response.data['results']], ['The Hobbit'])
+
+    def test_search_vector_not_exposed(self):
+        """Test the internal search vector is not serialized."""
+        book = Book.objects.get(title='Dune')
+        response = self.client.get(reverse('book-detail', kwargs={'pk': book.pk}))
+        self.assertNotIn('search_vector', response.data)
+
+
+class AuthorSuggestionTest(APITestCase):
+    """Test fuzzy author lookups and the author filter."""
+
+    def setUp(self):
+        Book.objects.create(title='The Hobbit', author='J.R.R. Tolkien')
+        Book.objects.create(title='Silmarillion', author='J.R.R. Tolkien')
+        Book.objects.create(title='Farmer Giles', author='Christopher Tolkien')
+        Book.objects.create(title='Dune', author='Frank Herbert')
+
+    def test_author_suggestions_ranked_and_distinct(self):
+        """Test suggestions are distinct authors ordered by similarity."""
+        response = self.client.get(reverse('book-author-suggestions'), {'q': 'tolkien'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        authors = [s['author'] for s in response.data['suggestions']]
+        self.assertEqual(authors, ['J.R.R. Tolkien', 'Christopher Tolkien'])
+        similarities = [s['similarity'] for s in response.data['suggestions']]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+    def test_author_suggestions_requires_query(self):
+        """Test missing q parameter is rejected."""
+        response = self.client.get(reverse('book-author-suggestions'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_by_author_did_you_mean(self):
+        """Test by-author offers suggestions only when nothing matches."""
+        response = self.client.get(reverse('book-by-author', kwargs={'author': 'Herbert'}))
+        self.assertNotIn('did_you_mean', response.data)
+        response = self.client.get(reverse('book-by-author', kwargs={'author': 'Nobody'}))
+        self.assertEqual(response.data['did_you_mean'], [])
+
+    def test_list_author_filter(self):
+        """Test the author filter sent by the frontend narrows the list."""
+        response = self.client.get(reverse('book-list'), {'author': 'herbert'})
+        self.assertEqual([b['title'] for b in response.data['results']], ['Dune'])
+
+
+class BookFacetTest(APITestCase):
+    """Test incrementally maintained author and genre facets."""
+
+    def setUp(self):
+        self.hobbit = Book.objects.create(title='The Hobbit', author='Tolkien', genre='Fantasy')
+        Book.objects.create(title='Silmarillion', author='Tolkien', genre='Fantasy')
+        Book.objects.create(title='Dune', author='Herbert', genre='Science Fiction')
+
+    def facets(self, name):
+        response = self.client.get(reverse(f'book-{name}'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['name']: row['count'] for row in response.data['results']}
+
+    def test_facets_follow_create_update_delete(self):
+        """Test counts track single-row writes without recomputation."""
+        self.assertEqual(self.facets('authors'), {'Tolkien': 2, 'Herbert': 1})
+        self.assertEqual(self.facets('genres'), {'Fantasy': 2, 'Science Fiction': 1})
+
+        response = self.client.patch(
+            reverse('book-detail', kwargs={'pk': self.hobbit.pk}),
+            {'author': 'J.R.R. Tolkien', 'genre': ''}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.facets('authors'), {'Tolkien': 1, 'J.R.R. Tolkien': 1, 'Herbert': 1})
+        self.assertEqual(self.facets('genres'), {'Fantasy': 1, 'Science Fiction': 1})
+
+        self.client.delete(reverse('book-detail', kwargs={'pk': self.hobbit.pk}))
+        self.assertEqual(self.facets('authors'), {'Tolkien': 1, 'Herbert': 1})
+
+    def test_facets_follow_bulk_update_by_author(self):
+        """Test update-by-author moves genre counts."""
+        self.client.patch(reverse('book-update-by-author'),
+                          {'author': 'Tolkien', 'update_data': {'genre': 'Epic'}}, format='json')
+        self.assertEqual(self.facets('genres'), {'Epic': 2, 'Science Fiction': 1})
+
+    def test_facets_prefix_filter_and_rebuild(self):
+        """Test prefix filtering and that a rebuild matches incremental counts."""
+        response = self.client.get(reverse('book-authors'), {'q': 'tol'})
+        self.assertEqual(response.data['results'], [{'name': 'Tolkien', 'count': 2}])
+        before = sorted(BookFacet.objects.values_list('kind', 'value', 'count'))
+        rebuild_facets()
+        self.assertEqual(sorted(BookFacet.objects.values_list('kind', 'value', 'count')), before)
+
+    def test_deltas_are_applied_set_based(self):
+        """Test any number of deltas costs one upsert plus one cleanup delete."""
+        deltas = {(BookFacet.AUTHOR, f'Author {i}'): 1 for i in range(50)}
+        deltas[(BookFacet.AUTHOR, 'Herbert')] = -1
+        deltas[(BookFacet.GENRE, 'Fantasy')] = 3
+        with self.assertNumQueries(2):
+            apply_facet_deltas(deltas)
+        self.assertEqual(self.facets('genres'), {'Fantasy': 5, 'Science Fiction': 1})
+        self.assertNotIn('Herbert', self.facets('authors'))
+        self.assertEqual(BookFacet.objects.filter(kind=BookFacet.AUTHOR).count(), 51)
+
+    def test_failed_facet_update_rolls_back_the_write(self):
+        """Test the book write and its facet update share one transaction."""
+        with mock.patch('books.signals.apply_facet_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                Book.objects.create(title='Orphan', author='Nobody')
+        self.assertFalse(Book.objects.filter(title='Orphan').exists())
+
+
+class BookBulkImportTest(APITestCase):
+    """Test the bulk import endpoint."""
+
+    def setUp(self):
+        Book.objects.create(title='Existing', author='Someone', isbn='9780000000001')
+        self.url = reverse('book-bulk')
+
+    def test_json_array_with_per_row_errors(self):
+        """Test valid rows are imported and invalid or duplicate rows reported."""
+        rows = [
+            {'title': 'One', 'author': 'A', 'isbn': '978-1-111-11111-1', 'genre': 'Poetry'},
+            {'title': 'Two', 'author': 'A', 'publication_date': '2001-02-03'},
+            {'title': '', 'author': 'B'},
+            {'title': 'Bad ISBN', 'author': 'B', 'isbn': '12345'},
+            {'title': 'Dup DB', 'author': 'C', 'isbn': '9780000000001'},
+            {'title': 'Dup batch', 'author': 'C', 'isbn': '978-1-111-11111-1'},
+            {'title': 'Bad date', 'author': 'C', 'publication_date': '2001-13-01'},
+        ]
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['failed'], 5)
+        self.assertEqual(
+            [(e['row'], sorted(e['errors'])) for e in response.data['errors']],
+            [(3, ['title']), (4, ['isbn']), (5, ['isbn']), (6, ['isbn']), (7, ['publication_date'])]
+        )
+        self.assertEqual(Book.objects.get(title='Two').publication_date.isoformat(), '2001-02-03')
+        self.assertEqual(BookFacet.objects.get(kind='author', value='A').count, 2)
+        self.assertEqual(BookFacet.objects.get(kind='genre', value='Poetry').count, 1)
+
+    def test_ndjson_and_csv_bodies(self):
+        """Test streaming NDJSON and CSV bodies are imported."""
+        ndjson = '{"title": "N1", "author": "X"}\n\nnot json\n{"title": "N2", "author": "X"}\n'
+        response = self.client.generic('POST', self.url, ndjson, content_type='application/x-ndjson')
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 1))
+
+        body = 'title,author,genre\nC1,Y,"Sci, Fi"\nC2,Y,\n'
+        response = self.client.generic('POST', self.url, body, content_type='text/csv')
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 0))
+        self.assertEqual(Book.objects.get(title='C1').genre, 'Sci, Fi')
+
+    def test_rejects_non_array_json(self):
+        """Test a JSON object body is rejected."""
+        response = self.client.post(self.url, {'title': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PopulateBooksCommandTest(TestCase):
+    """Test the synthetic catalogue generator."""
+
+    def test_isbn_check_digits(self):
+        """Test check digits against published ISBNs."""
+        self.assertEqual(isbn10_check_digit('030640615'), '2')
+        self.assertEqual(isbn10_check_digit('080442957'), 'X')
+        self.assertEqual(isbn13_check_digit('978030640615'), '7')
+
+    def test_generator_is_deterministic_and_valid(self):
+        """Test the same seed yields the same rows with valid, unique ISBNs."""
+        first = list(generate_books(500, seed=7, author_count=20))
+        self.assertEqual(first, list(generate_books(500, seed=7, author_count=20)))
+        isbns = [row['isbn'] for row in first if row['isbn']]
+        self.assertEqual(len(isbns), len(set(isbns)))
+        for isbn in isbns:
+            if len(isbn) == 10:
+                self.assertEqual(isbn[-1], isbn10_check_digit(isbn[:9]))
+            else:
+                self.assertEqual(isbn[-1], isbn13_check_digit(isbn[:12]))
+
+    def test_count_and_append(self):
+        """Test synthetic population, append mode and facet maintenance."""
+        out = StringIO()
+        call_command('populate_books', count=300, batch_size=100, stdout=out)
+        self.assertEqual(Book.objects.count(), 300)
+        self.assertIn('Successfully created 300 books!', out.getvalue())
+
+        call_command('populate_books', count=200, append=True, stdout=StringIO())
+        self.assertEqual(Book.objects.count(), 500)
+        self.assertEqual(
+            sum(BookFacet.objects.filter(kind='author').values_list('count', flat=True)), 500
+        )
+
+        out = StringIO()
+        call_command('populate_books', stdout=out)
+        self.assertNotIn('Error in row', out.getvalue())
+        self.assertTrue(Book.objects.filter(author='George Orwell').exists())
+        self.assertEqual(
+            sum(BookFacet.objects.filter(kind='author').values_list('count', flat=True)),
+            Book.objects.count()
+        )
+
+
+class BookWritePathTest(APITestCase):
+    """Test ISBN uniqueness is enforced by the database constraint alone."""
+
+    def setUp(self):
+        self.book = Book.objects.create(title='First', author='A', isbn='9780000000002')
+
+    def statements(self, write):
+        with CaptureQueriesContext(connection) as ctx:
+            write()
+        return [q['sql'].split()[0] for q in ctx.captured_queries]
+
+    def test_save_issues_no_uniqueness_queries(self):
+        """
+        Test create and update are one write plus the facet upsert, no SELECT.
+
+        The savepoint pair comes from the test's surrounding transaction;
+        outside one, the save runs in its own transaction instead.
+        """
+        book = Book(title='Second', author='B', isbn='9780000000003')
+        self.assertEqual(self.statements(book.save), ['SAVEPOINT', 'INSERT', 'INSERT', 'RELEASE'])
+        book.title = 'Second edition'
+        self.assertEqual(self.statements(book.save), ['SAVEPOINT', 'UPDATE', 'RELEASE'])
+        book.author = 'C'
+        self.assertEqual(self.statements(book.save), ['SAVEPOINT', 'UPDATE', 'INSERT', 'DELETE', 'RELEASE'])
+
+    def test_duplicate_isbn_raises_validation_error(self):
+        """Test a constraint violation maps to the ISBN validation error."""
+        with self.assertRaises(ValidationError) as ctx:
+            Book.objects.create(title='Copy', author='B', isbn='9780000000002')
+        self.assertEqual(ctx.exception.message_dict, {'isbn': ['This ISBN already exists.']})
+        # The surrounding transaction is still usable
+        self.assertEqual(Book.objects.count(), 1)
+
+    def test_duplicate_isbn_via_api_returns_400(self):
+        """Test duplicate ISBNs are reported as field errors by the API."""
+        response = self.client.post(reverse('book-list'),
+                                    {'title': 'Copy', 'author': 'B', 'isbn': '9780000000002'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['isbn'], ['This ISBN already exists.'])
+
+
+class NormalizedIsbnTest(APITestCase):
+    """Test canonical ISBN-13 storage and exact ISBN lookups."""
+
+    def setUp(self):
+        self.book = Book.objects.create(title='Stone', author='Rowling', isbn='0-7475-3269-9')
+
+    def test_to_isbn13(self):
+        """Test ISBN-10 conversion and ISBN-13 passthrough."""
+        self.assertEqual(to_isbn13('0-7475-3269-9'), '9780747532699')
+        self.assertEqual(to_isbn13('978-0-7475-3269-9'), '9780747532699')
+        self.assertEqual(to_isbn13(''), '')
+
+    def test_isbn13_populated_and_unique_across_forms(self):
+        """Test equivalent ISBN forms are rejected as duplicates."""
+        self.assertEqual(self.book.isbn13, '9780747532699')
+        with self.assertRaises(ValidationError):
+            Book.objects.create(title='Stone again', author='Rowling', isbn='978 0747532699')
+
+    def test_isbn_filter_accepts_any_form(self):
+        """Test ?isbn= matches regardless of hyphens or ISBN-10/13 form."""
+        url = reverse('book-list')
+        for isbn in ['9780747532699', '978-0747532699', '0747532699']:
+            with self.subTest(isbn=isbn):
+                response = self.client.get(url, {'isbn': isbn})
+                self.assertEqual([b['id'] for b in response.data['results']], [self.book.pk])
+        response = self.client.get(url, {'isbn': 'nonsense'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_update_by_author_keeps_isbn13_in_sync(self):
+        """Test bulk ISBN updates refresh the normalized column."""
+        url = reverse('book-update-by-author')
+        response = self.client.patch(url, {'author': 'Rowling', 'update_data': {'isbn': '0-7475-3849-2'}},
+                                     format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.isbn13, '9780747538493')
+        response = self.client.patch(url, {'author': 'Rowling', 'update_data': {'isbn': '123'}},
+                                     format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class Isbn13MigrationTest(TransactionTestCase):
+    """Test migration 0009 fills isbn13 from the legacy isbn column."""
+
+    migrate_from = [('books', '0008_isbn_violation_message')]
+    migrate_to = [('books', '0009_book_isbn13')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        self.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_malformed_legacy_isbns_are_left_blank_and_reported(self):
+        """Test invalid legacy ISBNs keep an empty isbn13 instead of aborting the migration."""
+        Book = self.migrate(self.migrate_from).get_model('books', 'Book')
+        for isbn in ('0-7475-3269-9', 'ABCDEFGHIJ', '12345678901234567', ''):
+            Book.objects.create(title=f'Legacy {isbn}', author='Legacy', isbn=isbn)
+        with self.assertLogs('books.migrations.0009_book_isbn13', 'WARNING') as logs:
+            Book = self.migrate(self.migrate_to).get_model('books', 'Book')
+        self.assertEqual(
+            dict(Book.objects.values_list('isbn', 'isbn13')),
+            {'0-7475-3269-9': '9780747532699', 'ABCDEFGHIJ': '', '12345678901234567': '', '': ''},
+        )
+        self.assertIn('2 books have an invalid ISBN', logs.output[0])
+        self.assertIn('ABCDEFGHIJ, 12345678901234567', logs.output[0])
+
+
+@override_settings(BOOK_CACHE_TIMEOUT=60)
+class BookResponseCacheTest(APITestCase):
+    """Test response caching, invalidation and conditional GETs."""
+
+    def setUp(self):
+        caches['default'].clear()
+        self.book = Book.objects.create(title='Cached', author='Author', genre='Drama')
+        self.list_url = reverse('book-list')
+        self.detail_url = reverse('book-detail', kwargs={'pk': self.book.pk})
+
+    def test_repeat_requests_hit_cache_without_queries(self):
+        """Test the second identical request is served from cache."""
+        first = self.client.get(self.list_url, {'genre__icontains': 'dr', 'ordering': 'title'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, {'ordering': 'title', 'genre__icontains': 'dr'})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_cache_hits_keep_headers_and_answer_if_modified_since(self):
+        """Test a hit carries the miss's headers and revalidates by date as well as ETag."""
+        first = self.client.get(self.detail_url)
+        second = self.client.get(self.detail_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        for header in ('Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Allow'):
+            with self.subTest(header=header):
+                self.assertEqual(second[header], first[header])
+
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['Last-Modified'], first['Last-Modified'])
+        self.assertEqual(response['Vary'], first['Vary'])
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:00 GMT')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_media_type_parameters_are_part_of_the_key(self):
+        """Test a response rendered for one media type is not served for another."""
+        for urlconf in ('library.urls', 'books.async_urls'):
+            with self.subTest(urlconf=urlconf), override_settings(ROOT_URLCONF=urlconf):
+                caches['default'].clear()
+                indented = self.client.get(self.detail_url, HTTP_ACCEPT='application/json; indent=4')
+                plain = self.client.get(self.detail_url, HTTP_ACCEPT='application/json')
+                self.assertEqual(plain['X-Cache'], 'MISS')
+                self.assertNotEqual(plain.content, indented.content)
+                self.assertNotEqual(plain['ETag'], indented['ETag'])
+
+    def test_writes_invalidate_cached_responses(self):
+        """Test model saves and update-by-author invalidate the cache."""
+        self.client.get(self.detail_url)
+        self.client.patch(self.detail_url, {'title': 'Renamed'})
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['title'], 'Renamed')
+
+        self.client.get(self.list_url)
+        self.client.patch(reverse('book-update-by-author'),
+                          {'author': 'Author', 'update_data': {'genre': 'Epic'}}, format='json')
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.json()['results'][0]['genre'], 'Epic')
+
+    def test_if_none_match_returns_304(self):
+        """Test a matching ETag yields 304 Not Modified."""
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_local_memory_cache_is_flagged(self):
+        """Test enabling the cache on per-process local memory raises a system check warning."""
+        with self.settings(BOOK_CACHE_TIMEOUT=60):
+            self.assertEqual([w.id for w in check_response_cache_backend(None)], ['books.W001'])
+        with self.settings(BOOK_CACHE_TIMEOUT=0):
+            self.assertEqual(check_response_cache_backend(None), [])
+
+
+class ConditionalGetTest(APITestCase):
+    """Test ETag and Last-Modified from updated_at answer unchanged reads with 304."""
+
+    def setUp(self):
+        self.book = Book.objects.create(title='Versioned', author='Author', genre='Drama')
+        Book.objects.create(title='Other', author='Author')
+        self.list_url = reverse('book-list')
+        self.detail_url = reverse('book-detail', kwargs={'pk': self.book.pk})
+
+    def test_detail_not_modified_until_saved(self):
+        """Test a current detail costs one query and no serialization."""
+        first = self.client.get(self.detail_url)
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(1), mock.patch.object(BookViewSet, 'get_serializer') as get_serializer:
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        get_serializer.assert_not_called()
+        self.assertEqual(response['ETag'], first['ETag'])
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.book.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_list_etag_tracks_page_contents(self):
+        """Test list pages revalidate until a book on them changes or leaves."""
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotEqual(self.client.get(self.list_url, {'fields': 'id'})['ETag'], etag)
+
+        self.client.patch(reverse('book-update-by-author'),
+                          {'author': 'Author', 'update_data': {'genre': 'Epic'}}, format='json')
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        Book.objects.filter(title='Other').delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_async_views_send_the_same_validators(self):
+        """Test the async views issue and honour the sync views' ETags."""
+        for path in (self.list_url, self.detail_url):
+            etag = self.client.get(path)['ETag']
+            with self.subTest(path), override_settings(ROOT_URLCONF='books.async_urls'):
+                self.assertEqual(self.client.get(path)['ETag'], etag)
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+@override_settings(COMPRESSION_MIN_BYTES=1024)
+class ResponseCompressionTest(APITestCase):
+    """Test negotiated compression of large JSON responses."""
+
+    def setUp(self):
+        for i in range(20):
+            Book.objects.create(title=f'Compressed {i}', author='Author', description='Long text. ' * 20)
+        self.url = reverse('book-list')
+
+    def test_gzip_large_json(self):
+        """Test large responses are gzipped with a weakened ETag."""
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], 'W/' + plain['ETag'])
+        self.assertEqual(
+            self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+
+    def test_zstd_and_brotli_are_negotiated(self):
+        """Test zstd is preferred over brotli and both decode to the plain body."""
+        plain = self.client.get(self.url)
+        decoders = {'zstd': zstandard.ZstdDecompressor().decompressobj().decompress,
+                    'br': brotli.decompress}
+        for header, encoding in (('zstd, br, gzip', 'zstd'), ('br, gzip', 'br')):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(decoders[encoding](response.content), plain.content)
+
+    def test_small_and_refused_responses_are_not_compressed(self):
+        """Test responses below the threshold or with q=0 are sent as they are."""
+        small = self.client.get(reverse('book-detail', args=[Book.objects.first().pk]), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_choose_encoding(self):
+        """Test q-values are honoured and zstd/brotli are preferred when installed."""
+        self.assertEqual(choose_encoding('gzip'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('*;q=0'))
+        self.assertEqual(choose_encoding('*'), next(iter(CODECS)))
+        self.assertEqual(choose_encoding('br;q=0.5, gzip;q=0.8'), 'gzip')
+
+    @override_settings(BOOK_CACHE_TIMEOUT=60)
+    def test_cache_hits_match_compressed_etags(self):
+        """Test a weak ETag from a compressed response revalidates a cached one."""
+        caches['default'].clear()
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class BookListFastPathTest(APITestCase):
+    """Test the values() fast path renders exactly like the model path."""
+
+    def setUp(self):
+        Book.objects.create(title='Ünïcode "quoted"', author='A', isbn='9780000000019',
+                            publication_date='1999-12-31', genre='Poetry')
+        Book.objects.create(title='No date', author='B')
+
+    def render_both(self):
+        books = Book.objects.order_by('id')
+        slow = JSONRenderer().render(BookListSerializer(list(books), many=True).data)
+        fast = JSONRenderer().render(
+            BookListSerializer(books.values(*BookListSerializer.Meta.fields), many=True).data
+        )
+        return slow, fast
+
+    def test_fast_path_is_byte_identical(self):
+        """Test both paths render the same bytes, also in a non-UTC zone."""
+        slow, fast = self.render_both()
+        self.assertEqual(fast, slow)
+        with self.settings(TIME_ZONE='Europe/Belgrade'):
+            slow, fast = self.render_both()
+            self.assertEqual(fast, slow)
+
+    def test_list_endpoint_uses_fast_path(self):
+        """Test the list endpoint output matches the model serializer."""
+        response = self.client.get(reverse('book-list'), {'ordering': 'title'})
+        books = Book.objects.annotate(title_lower=Lower('title')).order_by('title_lower', 'id')
+        self.assertEqual(response.data['results'], BookListSerializer(list(books), many=True).data)
+
+
+class SparseFieldsetTest(APITestCase):
+    """Test ?fields= and ?exclude= narrow both the response and the SQL."""
+
+    def setUp(self):
+        self.book = Book.objects.create(title='Dune', author='Frank Herbert', genre='Science Fiction',
+                                        publication_date='1965-08-01', description='Spice. ' * 200)
+        Book.objects.create(title='Emma', author='Jane Austen', publication_date='1815-12-23')
+
+    def get(self, path, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, queries[-1]['sql']
+
+    def test_list_fields(self):
+        """Test a list limited to id and title selects only those columns."""
+        response, sql = self.get(reverse('book-list'), {'fields': 'id,title', 'ordering': 'title'})
+        self.assertEqual(response.data['results'], [{'id': self.book.pk, 'title': 'Dune'},
+                                                    {'id': self.book.pk + 1, 'title': 'Emma'}])
+        self.assertNotIn('"author"', sql)
+        self.assertNotIn('"isbn"', sql)
+
+    def test_detail_exclude(self):
+        """Test excluding the description leaves it out of the detail query."""
+        response, sql = self.get(reverse('book-detail', args=[self.book.pk]), {'exclude': 'description'})
+        self.assertNotIn('description', response.data)
+        self.assertEqual(response.data['title'], 'Dune')
+        self.assertNotIn('"description"', sql)
+        response, _ = self.get(reverse('book-detail', args=[self.book.pk]), {'fields': 'description'})
+        self.assertEqual(response.data, {'description': self.book.description})
+
+    def test_cursor_pagination_without_sort_field(self):
+        """Test cursor pages still link onwards when the sort key is not requested."""
+        params = {'fields': 'title', 'pagination': 'cursor', 'ordering': 'publication_date', 'page_size': 1}
+        response, _ = self.get(reverse('book-list'), params)
+        self.assertEqual(response.data['results'], [{'title': 'Emma'}])
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], [{'title': 'Dune'}])
+
+    def test_invalid_fieldsets(self):
+        """Test unknown names and excluding every field are rejected."""
+        response = self.client.get(reverse('book-list'), {'fields': 'title,description'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('description', response.data['fields'][0])
+        response = self.client.get(reverse('book-detail', args=[self.book.pk]), {'fields': 'id', 'exclude': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('exclude', response.data)
+
+    def test_writes_return_every_field(self):
+        """Test writes ignore the fieldset parameters."""
+        response = self.client.patch(reverse('book-detail', args=[self.book.pk]) + '?fields=id',
+                                     {'genre': 'Classic'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['genre'], 'Classic')
+        self.assertIn('description', response.data)
+
+
+class BookBatchTest(APITestCase):
+    """Test fetching many books by id or ISBN in one request."""
+
+    def setUp(self):
+        self.books = [
+            Book.objects.create(title=f'Batch {i}', author='Batch Author', isbn=isbn_for(i, 9))
+            for i in range(3)
+        ]
+        self.url = reverse('book-batch')
+
+    def test_ids_keep_request_order_and_report_missing(self):
+        """Test books come back in request order with unknown ids listed as missing."""
+        first, second, third = self.books
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'ids': f'{third.pk},999,{first.pk},{third.pk}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([book['id'] for book in response.data['results']], [third.pk, first.pk])
+        self.assertEqual(response.data['missing'], ['999'])
+        self.assertEqual(response.data['results'][0], self.client.get(reverse('book-detail', args=[third.pk])).data)
+
+    def test_isbns_in_any_form(self):
+        """Test ISBN keys are normalized; invalid ones are reported as missing."""
+        isbn13 = self.books[1].isbn13
+        hyphenated = f'{isbn13[:3]}-{isbn13[3:]}'
+        response = self.client.get(self.url, {'isbns': f'{hyphenated},not-an-isbn'})
+        self.assertEqual([book['id'] for book in response.data['results']], [self.books[1].pk])
+        self.assertEqual(response.data['missing'], ['not-an-isbn'])
+
+    def test_post_body_and_fieldset(self):
+        """Test large key sets can be posted and narrowed with ?fields=."""
+        ids = [self.books[2].pk, self.books[0].pk, 12345]
+        response = self.client.post(self.url + '?fields=title', {'ids': ids}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'title': 'Batch 2'}, {'title': 'Batch 0'}])
+        self.assertEqual(response.data['missing'], [12345])
+
+    def test_invalid_requests(self):
+        """Test missing, mixed, malformed and oversized key sets are rejected."""
+        for params in ({}, {'ids': '1', 'isbns': '9780000000019'}, {'ids': '1,x'},
+                       {'ids': ','.join(str(i) for i in range(MAX_BATCH_SIZE + 1))}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+        for ids in ({'a': 1}, [True], [self.books[0].pk, False]):
+            with self.subTest(ids=ids):
+                response = self.client.post(self.url, {'ids': ids}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ids_outside_the_primary_key_range_are_rejected(self):
+        """Test ids too large for a bigint get a 400 instead of overflowing the driver."""
+        for ids in ('99999999999999999999', '-99999999999999999999'):
+            with self.subTest(ids=ids):
+                response = self.client.get(self.url, {'ids': ids})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('error', response.data)
+        response = self.client.post(self.url, {'ids': [2 ** 63]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keys_naming_the_same_book_are_deduplicated(self):
+        """Test keys are deduplicated after parsing, keeping the first spelling."""
+        book = self.books[0]
+        response = self.client.get(self.url, {'ids': f'{book.pk},0{book.pk},999,0999'})
+        self.assertEqual([result['id'] for result in response.data['results']], [book.pk])
+        self.assertEqual(response.data['missing'], ['999'])
+        response = self.client.post(self.url, {'ids': [book.pk, str(book.pk)]}, format='json')
+        self.assertEqual([result['id'] for result in response.data['results']], [book.pk])
+        isbn13 = book.isbn13
+        response = self.client.get(self.url, {'isbns': f'{isbn13},{isbn13[:3]}-{isbn13[3:]},{book.isbn}'})
+        self.assertEqual([result['id'] for result in response.data['results']], [book.pk])
+        self.assertEqual(response.data['missing'], [])
+
+
+class BookExportTest(APITestCase):
+    """Test the streaming export endpoint."""
+
+    def setUp(self):
+        Book.objects.create(title='Dune', author='Frank Herbert', isbn='9780441013593',
+                            publication_date='1965-08-01', genre='Science Fiction')
+        Book.objects.create(title='Emma, a novel', author='Jane Austen')
+        self.url = reverse('book-export')
+
+    def test_ndjson_export_matches_detail_representation(self):
+        """Test NDJSON is the default and each line matches the detail view."""
+        response = self.client.get(self.url, {'ordering': 'title'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        self.assertIn('books.ndjson', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        dune = Book.objects.get(title='Dune')
+        self.assertEqual(json.loads(lines[0]), self.client.get(reverse('book-detail', args=[dune.pk])).json())
+        self.assertEqual(len(lines), 2)
+
+    def test_csv_export_honours_filters(self):
+        """Test CSV output has a header and applies filters and search."""
+        response = self.client.get(self.url, {'format': 'csv', 'search': 'austen'})
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['title'] for row in rows], ['Emma, a novel'])
+        self.assertEqual(rows[0]['publication_date'], '')
+
+
+class AsyncReadViewTest(APITestCase):
+    """Test the async read views match the sync viewset byte for byte."""
+
+    def setUp(self):
+        for i in range(3):
+            Book.objects.create(title=f'Async {i}', author='Ada Lovelace', genre='Science',
+                                isbn=isbn_for(i, 7))
+        self.book = Book.objects.first()
+
+    def assert_same_response(self, path, params=None):
+        expected = self.client.get(path, params)
+        with override_settings(ROOT_URLCONF='books.async_urls'):
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['Allow'], expected['Allow'])
+        return response
+
+    def test_async_urlconf_routes_reads_to_async_views(self):
+        """Test the async URLconf resolves reads to coroutine views."""
+        match = resolve(reverse('book-list'), urlconf='books.async_urls')
+        self.assertTrue(inspect.iscoroutinefunction(match.func))
+
+    def test_list_detail_and_by_author_match_sync_views(self):
+        """Test list, retrieve and by-author output is identical."""
+        self.assert_same_response(reverse('book-list'), {'ordering': 'title'})
+        self.assert_same_response(reverse('book-list'), {'search': 'async', 'genre__icontains': 'sci'})
+        self.assert_same_response(reverse('book-list'), {'fields': 'id,title', 'ordering': '-title'})
+        self.assert_same_response(reverse('book-detail', args=[self.book.pk]), {'exclude': 'description'})
+        self.assert_same_response(reverse('book-list'), {'fields': 'nope'})
+        self.assert_same_response(reverse('book-detail', args=[self.book.pk]))
+        self.assert_same_response(reverse('book-detail', args=[999]))
+        self.assert_same_response(reverse('book-by-author', kwargs={'author': 'lovelace'}))
+        self.assert_same_response(reverse('book-by-author', kwargs={'author': 'lovelac'}))
+
+    def test_unsupported_requests_fall_back_to_viewset(self):
+        """Test writes, cursor pagination and invalid pages use the sync views."""
+        self.assert_same_response(reverse('book-list'), {'pagination': 'cursor'})
+        self.assert_same_response(reverse('book-list'), {'page': 99})
+        with override_settings(ROOT_URLCONF='books.async_urls'):
+            response = self.client.post(reverse('book-list'), {'title': 'New', 'author': 'Async'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @override_settings(BOOK_CACHE_TIMEOUT=60, ROOT_URLCONF='books.async_urls')
+    def test_async_list_uses_response_cache(self):
+        """Test the async list is served from the response cache."""
+        caches['default'].clear()
+        first = self.client.get(reverse('book-list'))
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list'))
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual((response['Allow'], response['Vary']), (first['Allow'], first['Vary']))
+
+
+@override_settings(BOOK_READ_REPLICAS=['replica'])
+class ReplicaRoutingTest(APITransactionTestCase):
+    """Test safe requests read from the replica with read-your-writes stickiness."""
+
+    # Not a TestCase: its wrapping transaction would pin every read to the primary
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        Book.objects.create(title='On primary', author='Primary Author')
+        Book.objects.using('replica').create(title='On replica', author='Replica Author')
+        self.url = reverse('book-list')
+
+    def titles(self):
+        return [book['title'] for book in self.client.get(self.url).data['results']]
+
+    def test_reads_use_replica_and_writes_use_primary(self):
+        """Test list and facets read from the replica; creates go to the primary."""
+        self.assertEqual(self.titles(), ['On replica'])
+        response = self.client.get(reverse('book-authors'))
+        self.assertEqual([row['name'] for row in response.data['results']], ['Replica Author'])
+        self.client.post(self.url, {'title': 'New', 'author': 'Writer'}, format='json')
+        self.assertTrue(Book.objects.using('default').filter(title='New').exists())
+        self.assertFalse(Book.objects.using('replica').filter(title='New').exists())
+
+    def test_reads_stick_to_primary_after_own_write(self):
+        """Test a client's reads go to the primary after it writes."""
+        response = self.client.post(self.url, {'title': 'New', 'author': 'Writer'}, format='json')
+        self.assertIn('books_primary', response.cookies)
+        self.assertEqual(set(self.titles()), {'On primary', 'New'})
+        self.client.cookies.clear()
+        self.assertEqual(self.titles(), ['On replica'])
+
+    def test_read_only_posts_use_replica_without_sticking(self):
+        """Test a POST batch lookup reads the replica and leaves the client unpinned."""
+        replica_book = Book.objects.using('replica').get()
+        response = self.client.post(reverse('book-batch'), {'ids': [replica_book.pk]}, format='json')
+        self.assertEqual([book['title'] for book in response.data['results']], ['On replica'])
+        self.assertNotIn('books_primary', response.cookies)
+        self.assertEqual(self.titles(), ['On replica'])
+
+    def test_reads_outside_requests_use_primary(self):
+        """Test code outside the request cycle always reads the primary."""
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ['On primary'])
+
+
+@override_settings(REQUEST_METRICS=True,
+                   MIDDLEWARE=['books.metrics.RequestMetricsMiddleware', *settings.MIDDLEWARE])
+class RequestMetricsTest(APITestCase):
+    """Test request timing headers, slow logs and the metrics endpoint."""
+
+    def setUp(self):
+        Book.objects.create(title='Measured', author='Meter')
+
+    def test_server_timing_header_reports_queries(self):
+        """Test the Server-Timing header carries total and SQL timings."""
+        response = self.client.get(reverse('book-list'))
+        self.assertRegex(response['Server-Timing'], r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="2 queries"$')
+
+    def test_metrics_endpoint_exposes_histograms(self):
+        """Test request histograms are exposed in Prometheus format."""
+        self.client.get(reverse('book-list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'http_request_db_queries_bucket\{method="GET",view="book-list",status="200",le="2"\} [1-9]')
+        self.assertIn('http_response_size_bytes_count{method="GET",view="book-list",status="200"}', body)
+
+    @override_settings(ROOT_URLCONF='books.async_urls')
+    async def test_async_views_report_queries(self):
+        """Test SQL run by native async views from worker threads is counted."""
+        await sync_to_async(install_query_timer)(connection)
+        response = await self.async_client.get('/books/')
+        self.assertRegex(response['Server-Timing'], r'desc="2 queries"$')
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_QUERY_MS=0)
+    def test_slow_requests_and_queries_are_logged(self):
+        """Test requests and queries above the thresholds are logged."""
+        with self.assertLogs('books.metrics', 'WARNING') as logs:
+            self.client.get(reverse('book-list'))
+        self.assertTrue(any('Slow query' in line for line in logs.output))
+        self.assertTrue(any('Slow request' in line and '/books/' in line for line in logs.output))
+
+    @override_settings(REQUEST_METRICS=False)
+    def test_metrics_endpoint_disabled_by_default(self):
+        """Test /metrics is not served unless metrics are enabled."""
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ApiBenchmarkTest(APITestCase):
+    """Test the API benchmark scenarios and baseline comparison."""
+
+    def test_scenarios_report_latency_and_queries(self):
+        """Test every scenario runs against a small catalogue and is measured."""
+        import_books(generate_books(60, seed=7, author_count=5))
+        results = run_benchmark(self.client, iterations=3, warmup=1, seed=7)
+        self.assertEqual(list(results), SCENARIO_NAMES)
+        for stats in results.values():
+            self.assertLessEqual(stats['p50_ms'], stats['p95_ms'])
+            self.assertLessEqual(stats['p95_ms'], stats['p99_ms'])
+            self.assertGreater(stats['rps'], 0)
+            self.assertGreaterEqual(stats['queries'], 1)
+
+    def test_find_regressions(self):
+        """Test slower p95 latency and extra queries are flagged."""
+        baseline = {'1000': {'list': {'p95_ms': 10.0, 'queries': 2}}}
+        self.assertEqual(find_regressions({'1000': {'list': {'p95_ms': 12.0, 'queries': 2}}}, baseline), [])
+        regressions = find_regressions({'1000': {'list': {'p95_ms': 13.0, 'queries': 3}}}, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(find_regressions({'5000': {'list': {'p95_ms': 99.0, 'queries': 9}}}, baseline), [])
+
+
+class QueryCountTest(APITestCase):
+    """
+    Guard the number of SQL queries each BookViewSet action issues.
+
+    Every request is measured against catalogues of each size in ``SIZES``
+    and must issue exactly its budgeted number of queries at all of them, so
+    an N+1 or a count that grows with the result size fails here. Counts
+    include the savepoints of the test transaction.
+    """
+
+    SIZES = (1, 20, 150)
+    AUTHOR = 'Query Counter'
+
+    # (action, label, queries, request(book) -> (method, path, data)); bulk
+    # imports insert per batch, so their payload stays below one batch
+    BUDGETS = [
+        ('list', 'list', 2, lambda book: ('get', reverse('book-list'), None)),
+        ('list', 'ordering', 2, lambda book: ('get', reverse('book-list') + '?ordering=title', None)),
+        ('list', 'filter', 2, lambda book: (
+            'get', reverse('book-list') + '?genre__icontains=fic&publication_date_from=2000-01-01', None)),
+        ('list', 'search', 2, lambda book: ('get', reverse('book-list') + '?search=tale', None)),
+        ('list', 'cursor', 1, lambda book: ('get', reverse('book-list') + '?pagination=cursor', None)),
+        ('list', 'sparse list', 2, lambda book: ('get', reverse('book-list') + '?fields=id,title', None)),
+        ('retrieve', 'retrieve', 1, lambda book: ('get', reverse('book-detail', args=[book.pk]), None)),
+        ('retrieve', 'sparse retrieve', 1, lambda book: (
+            'get', reverse('book-detail', args=[book.pk]) + '?exclude=description', None)),
+        ('create', 'create', 4, lambda book: ('post', reverse('book-list'), {
+            'title': 'Counted', 'author': QueryCountTest.AUTHOR, 'isbn': isbn_for(10 ** 6, 5)})),
+        ('update', 'update', 4, lambda book: ('put', reverse('book-detail', args=[book.pk]), {
+            'title': 'Renamed', 'author': book.author, 'genre': book.genre})),
+        ('partial_update', 'partial_update', 4, lambda book: (
+            'patch', reverse('book-detail', args=[book.pk]), {'description': 'Revised'})),
+        ('destroy', 'destroy', 4, lambda book: ('delete', reverse('book-detail', args=[book.pk]), None)),
+        ('update_by_author', 'update_by_author', 3, lambda book: (
+            'patch', reverse('book-update-by-author'),
+            {'author': QueryCountTest.AUTHOR, 'update_data': {'description': 'Revised'}})),
+        ('update_by_author', 'update_by_author async', 1, lambda book: (
+            'patch', reverse('book-update-by-author'),
+            {'author': QueryCountTest.AUTHOR, 'update_data': {'description': 'Revised'}, 'async': True})),
+        ('job', 'job', 1, lambda book: (
+            'get', reverse('book-job', args=[enqueue_update_job(QueryCountTest.AUTHOR, {'genre': 'Drama'}).pk]),
+            None)),
+        ('bulk', 'bulk', 5, lambda book: ('post', reverse('book-bulk'), [
+            {'title': f'Imported {number}', 'author': 'Importer', 'isbn': isbn_for(10 ** 6 + number, 5)}
+            for number in range(50)
+        ])),
+        ('batch', 'batch', 1, lambda book: (
+            'get', reverse('book-batch') + f'?ids={book.pk},{book.pk + 1},0', None)),
+        ('batch', 'batch post', 1, lambda book: (
+            'post', reverse('book-batch'), {'ids': list(range(book.pk, book.pk + 100))})),
+        ('export', 'export', 1, lambda book: ('get', reverse('book-export'), None)),
+        ('by_author', 'by_author', 1, lambda book: (
+            'get', reverse('book-by-author', args=[QueryCountTest.AUTHOR]), None)),
+        ('by_author', 'by_author miss', 2, lambda book: (
+            'get', reverse('book-by-author', args=['Nobody']), None)),
+        ('author_suggestions', 'author_suggestions', 1, lambda book: (
+            'get', reverse('book-author-suggestions') + '?q=quer', None)),
+        ('authors', 'authors', 1, lambda book: ('get', reverse('book-authors'), None)),
+        ('genres', 'genres', 1, lambda book: ('get', reverse('book-genres'), None)),
+    ]
+
+    def seed(self, size):
+        """Import ``size`` books by one author and return the first."""
+        import_books({
+            'title': f'Counted Tale {number}',
+            'author': self.AUTHOR,
+            'isbn': isbn_for(number, 5),
+            'genre': 'Fiction',
+            'publication_date': '2001-01-01',
+            'description': 'A book to count queries against.',
+        } for number in range(size))
+        return Book.objects.order_by('id').first()
+
+    def test_every_action_has_a_budget(self):
+        """Test new viewset actions cannot ship without a query budget."""
+        actions = {'list', 'create', 'retrieve', 'update', 'partial_update', 'destroy'}
+        actions.update(view.__name__ for view in BookViewSet.get_extra_actions())
+        self.assertEqual(actions, {action for action, _, _, _ in self.BUDGETS})
+
+    def test_query_counts_do_not_grow_with_data(self):
+        """Test each action issues its budgeted queries at every catalogue size."""
+        for _, label, queries, make_request in self.BUDGETS:
+            for size in self.SIZES:
+                with self.subTest(label, size=size), transaction.atomic():
+                    method, path, data = make_request(self.seed(size))
+                    with self.assertNumQueries(queries):
+                        if data is None:
+                            response = getattr(self.client, method)(path)
+                        else:
+                            response = getattr(self.client, method)(path, data, format='json')
+                        if response.streaming:
+                            b''.join(response.streaming_content)
+                    self.assertLess(response.status_code, 400)
+                    transaction.set_rollback(True)
+
+
+class EstimatedCountPaginationTest(APITestCase):
+    """Test planner estimates replace COUNT(*) on large unfiltered lists."""
+
+    def setUp(self):
+        Book.objects.create(title='Counted', author='Estimator', genre='Fiction')
+        Book.objects.create(title='Also Counted', author='Estimator', genre='Drama')
+        # Stand-in for PostgreSQL's estimate of a large, unfiltered table
+        self.estimate = mock.patch(
+            'books.pagination.estimated_count',
+            side_effect=lambda queryset: 250000 if can_estimate(queryset) else None,
+        )
+
+    def test_only_unfiltered_querysets_are_estimated(self):
+        """Test filtered querysets and a zero threshold always count exactly."""
+        self.assertTrue(can_estimate(Book.objects.all()))
+        self.assertFalse(can_estimate(Book.objects.filter(genre='Drama')))
+        with override_settings(BOOK_ESTIMATED_COUNT_THRESHOLD=0):
+            self.assertFalse(can_estimate(Book.objects.all()))
+
+    def test_exact_count_is_flagged(self):
+        """Test exact counts are reported as not estimated."""
+        response = self.client.get(reverse('book-list'))
+        self.assertEqual(response.data['count'], 2)
+        self.assertIs(response.data['count_estimated'], False)
+
+    def test_large_unfiltered_list_returns_estimate(self):
+        """Test the estimate is returned without running COUNT(*)."""
+        with self.estimate, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list'))
+        self.assertEqual(response.data['count'], 250000)
+        self.assertIs(response.data['count_estimated'], True)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+        # Paging follows the rows, not the estimate
+        self.assertIsNone(response.data['next'])
+        with self.estimate:
+            response = self.client.get(reverse('book-list'), {'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_low_estimate_does_not_hide_rows(self):
+        """Test every row stays reachable when the estimate is below the real count."""
+        Book.objects.bulk_create(Book(title=f'Extra {i}', author='Estimator') for i in range(148))
+        low_estimate = mock.patch(
+            'books.pagination.estimated_count',
+            side_effect=lambda queryset: 95 if can_estimate(queryset) else None,
+        )
+        with low_estimate:
+            first = self.client.get(reverse('book-list'))
+            second = self.client.get(first.data['next'])
+            third = self.client.get(reverse('book-list'), {'page': 3})
+        self.assertEqual(first.data['count'], 95)
+        self.assertEqual(len(first.data['results']), 100)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(second.data['results']), 50)
+        self.assertIsNone(second.data['next'])
+        self.assertIsNotNone(second.data['previous'])
+        self.assertEqual(third.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filtered_list_counts_exactly(self):
+        """Test filtered lists ignore the estimate."""
+        with self.estimate:
+            response = self.client.get(reverse('book-list'), {'genre__icontains': 'drama'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertIs(response.data['count_estimated'], False)
+
+    @override_settings(ROOT_URLCONF='books.async_urls')
+    async def test_async_list_returns_estimate(self):
+        """Test the async list view reports the same estimate."""
+        with self.estimate:
+            response = await self.async_client.get('/books/')
+        self.assertEqual(response.json()['count'], 250000)
+        self.assertIs(response.json()['count_estimated'], True)
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNone(response.json()['next'])
+
+
+class BookIndexUsageTest(APITestCase):
+    """Test every supported list ordering and range filter is served by an index."""
+
+    # List query parameters and the index that must serve them
+    SHAPES = [
+        ({}, 'books_book_created_id_idx'),
+        ({'ordering': 'created_at'}, 'books_book_created_id_idx'),
+        ({'ordering': 'title'}, 'books_book_title_lower_id_idx'),
+        ({'ordering': '-title'}, 'books_book_title_lower_id_idx'),
+        ({'ordering': 'author'}, 'books_book_author_lower_id_idx'),
+        ({'ordering': '-author'}, 'books_book_author_lower_id_idx'),
+        ({'ordering': 'publication_date'}, 'books_book_pub_date_id_idx'),
+        ({'ordering': '-publication_date'}, 'books_book_pub_date_id_idx'),
+        ({'ordering': 'publication_date', 'publication_date_from': '2000-01-01'}, 'books_book_pub_date_id_idx'),
+        ({'genre': 'Fantasy', 'ordering': 'publication_date'}, 'books_book_genre_pub_id_idx'),
+        ({'genre': 'Fantasy', 'ordering': '-publication_date', 'publication_date_from': '2000-01-01'},
+         'books_book_genre_pub_id_idx'),
+    ]
+
+    def explain(self, params):
+        view = BookViewSet(action='list', format_kwarg=None, kwargs={})
+        view.request = Request(APIRequestFactory().get(reverse('book-list'), params))
+        queryset = view.filter_queryset(view.get_queryset())[:api_settings.PAGE_SIZE]
+        if connection.vendor != 'postgresql':
+            return queryset.explain()
+        # Scanning or sorting a small test table is cheap; ask the planner
+        # whether an ordered index scan can serve the query at all
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+            return queryset.explain()
+
+    def test_list_query_shapes_use_an_index(self):
+        """Test each shape is an index scan with no separate sort step."""
+        import_books(generate_books(200))
+        for params, index in self.SHAPES:
+            with self.subTest(**params):
+                plan = self.explain(params)
+                self.assertIn(index, plan)
+                self.assertNotIn('TEMP B-TREE', plan)  # SQLite sort
+                self.assertNotIn('Sort', plan)  # PostgreSQL sort
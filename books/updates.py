@@ -0,0 +1,148 @@
+"""
+Set-based updates of many books in one ``UPDATE ... RETURNING`` statement.
+
+``QuerySet.update()`` cannot return the changed rows, so callers used to run
+``exists()``, ``update()`` and a re-select - three scans of the same filter.
+``update_returning`` issues a single statement and yields the new values of
+every updated row. On PostgreSQL the previous genre is returned alongside by
+joining a locked snapshot of the rows, so facet counts need no extra query.
+"""
+import heapq
+from collections import Counter
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models.expressions import Col
+from django.utils import timezone
+
+from .facets import apply_facet_deltas, genre_change_deltas
+from .models import Book, BookFacet
+from .validators import to_isbn13, validate_isbn
+
+# Fields that may be set on many books at once
+BULK_UPDATE_FIELDS = {'genre', 'description', 'publication_date', 'isbn'}
+
+
+def clean_update_values(data):
+    """
+    Validate ``{field: value}`` for a bulk update the way ``Book.full_clean`` would.
+
+    Returns the cleaned values, including the derived ``isbn13`` and a fresh
+    ``updated_at``. Raises ``ValidationError`` with a per-field error dict.
+    """
+    values, errors = {}, {}
+    for name, value in data.items():
+        field = Book._meta.get_field(name)
+        if value is None and not field.null:
+            value = ''
+        try:
+            values[name] = field.clean(value, None)
+            if name == 'isbn' and values[name].strip():
+                validate_isbn(values[name])
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    if 'isbn' in values:
+        values['isbn13'] = to_isbn13(values['isbn'])
+    values['updated_at'] = timezone.now()
+    return values
+
+
+def _converters(columns, connection):
+    table = Book._meta.db_table
+    converters = []
+    for name in columns:
+        field = Book._meta.get_field(name)
+        col = Col(table, field)
+        converters.append(connection.ops.get_db_converters(col) + field.get_db_converters(connection))
+    return converters
+
+
+def update_returning(queryset, values, columns, using='default', chunk_size=2000):
+    """
+    Apply ``values`` to every book in ``queryset`` with one statement.
+
+    Yields ``(row, previous_genre)`` where ``row`` maps ``columns`` to the
+    updated values. ``previous_genre`` is None when it was not fetched, which
+    is the case unless ``genre`` is updated on PostgreSQL.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(Book._meta.db_table)
+    pk = quote(Book._meta.pk.column)
+
+    with_previous = 'genre' in values and connection.vendor == 'postgresql'
+    inner = queryset.using(using).order_by().values('id', 'genre')
+    if with_previous:
+        # Lock the snapshot so the previous genre cannot change underneath
+        inner = inner.select_for_update()
+    inner_sql, inner_params = inner.query.get_compiler(using).as_sql()
+
+    fields = [Book._meta.get_field(name) for name in values]
+    assignments = ', '.join(f'{quote(field.column)} = %s' for field in fields)
+    params = [field.get_db_prep_save(values[field.name], connection) for field in fields]
+    returning = [f'{table}.{quote(Book._meta.get_field(name).column)}' for name in columns]
+
+    if with_previous:
+        previous = quote('previous')
+        returning.append(f'{previous}.{quote("genre")}')
+        sql = (f'UPDATE {table} SET {assignments} FROM ({inner_sql}) AS {previous} '
+               f'WHERE {table}.{pk} = {previous}.{quote("id")} RETURNING {", ".join(returning)}')
+    else:
+        sql = (f'UPDATE {table} SET {assignments} WHERE {pk} IN '
+               f'(SELECT {quote("id")} FROM ({inner_sql}) AS {quote("matched")}) '
+               f'RETURNING {", ".join(returning)}')
+
+    converters = list(zip(columns, _converters(columns, connection)))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + list(inner_params))
+        while True:
+            fetched = cursor.fetchmany(chunk_size)
+            if not fetched:
+                return
+            for record in fetched:
+                row = {}
+                for (name, field_converters), value in zip(converters, record):
+                    for converter in field_converters:
+                        value = converter(value, None, connection)
+                    row[name] = value
+                yield row, record[len(columns)] if with_previous else None
+
+
+def update_books(queryset, data, columns, limit, using='default'):
+    """
+    Validate ``data`` and apply it to ``queryset``, keeping facets in step.
+
+    Must run inside a transaction. Returns ``(count, rows)`` where ``rows``
+    holds the ``limit`` most recently created updated books, newest first.
+    """
+    values = clean_update_values(data)
+    columns = list(dict.fromkeys([*columns, 'id', 'created_at']))
+    connection = connections[using]
+
+    deltas = Counter()
+    if 'genre' in values and connection.vendor != 'postgresql':
+        deltas = genre_change_deltas(queryset.using(using), values['genre'])
+
+    count = 0
+
+    def updated():
+        nonlocal count
+        for row, previous_genre in update_returning(queryset, values, columns, using):
+            count += 1
+            if previous_genre is not None and previous_genre != values['genre']:
+                if previous_genre:
+                    deltas[(BookFacet.GENRE, previous_genre)] -= 1
+                if values['genre']:
+                    deltas[(BookFacet.GENRE, values['genre'])] += 1
+            yield row
+
+    if limit > 0:
+        rows = heapq.nlargest(limit, updated(), key=lambda row: (row['created_at'], row['id']))
+    else:
+        rows = []
+        for _ in updated():
+            pass
+    apply_facet_deltas(deltas, using=using)
+    return count, rows
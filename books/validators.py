@@ -0,0 +1,48 @@
+"""
+ISBN validation and normalization shared by the model and the bulk import path.
+"""
+import re
+from django.core.exceptions import ValidationError
+from .constants import ISBN_COMBINED_PATTERN
+
+
+def clean_isbn(value):
+    """Strip hyphens and spaces and upper-case an ISBN as entered."""
+    return value.replace('-', '').replace(' ', '').upper()
+
+
+def validate_isbn(value):
+    """Validate ISBN-10/13 format without touching the database."""
+    isbn = clean_isbn(value)
+
+    if not re.fullmatch(ISBN_COMBINED_PATTERN, isbn):
+        raise ValidationError('ISBN must be 10 or 13 characters (digits or X for ISBN-10).')
+
+    if len(isbn) == 10 and 'X' in isbn[:-1]:
+        raise ValidationError("In ISBN-10, 'X' is allowed only as the last character.")
+
+
+def isbn10_check_digit(core):
+    """Return the ISBN-10 check character for a 9-digit core."""
+    total = sum((10 - i) * int(digit) for i, digit in enumerate(core))
+    check = (11 - total % 11) % 11
+    return 'X' if check == 10 else str(check)
+
+
+def isbn13_check_digit(body):
+    """Return the ISBN-13 check digit for a 12-digit body."""
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(body))
+    return str((10 - total % 10) % 10)
+
+
+def to_isbn13(value):
+    """
+    Return the canonical ISBN-13 for a format-valid ISBN, or '' if blank.
+
+    ISBN-10s are converted to the 978 prefix with a recomputed check digit.
+    """
+    isbn = clean_isbn(value or '')
+    if len(isbn) == 10:
+        body = '978' + isbn[:9]
+        return body + isbn13_check_digit(body)
+    return isbn
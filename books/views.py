@@ -1,50 +1,143 @@
-from rest_framework import viewsets, status, filters
+from rest_framework import exceptions, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField
 from django.db.models.functions import Lower
-from .models import Book
-from .serializers import BookSerializer, BookListSerializer, BookCreateSerializer
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+from .models import Book, BookFacet, BookUpdateJob, DUPLICATE_ISBN_MESSAGE, is_duplicate_isbn_error
+from .serializers import (
+    BookSerializer, BookListSerializer, BookCreateSerializer, BookUpdateJobSerializer, row_converters
+)
+from .bulk import import_books, iter_csv, iter_ndjson
+from .cache import CachedResponseMixin, invalidate_book_cache
+from .conditional import ConditionalResponseMixin
+from .export import iter_export_rows, stream_csv, stream_ndjson
 from .filters import BookFilterSet
+from .jobs import enqueue_update_job
+from .middleware import read_only
+from .pagination import BookCursorPagination, SortKey
+from .renderers import CSVRenderer, NDJSONRenderer
+from .search import BookSearchFilter, SEARCH_RANK_FIELD, suggest_authors
+from .updates import BULK_UPDATE_FIELDS, update_books
+from .validators import to_isbn13, validate_isbn
 
-# Valid fields for bulk updates
-BULK_UPDATE_FIELDS = {'genre', 'description', 'publication_date', 'isbn'}
+# Supported ordering keys: (sort field, annotation expression, nullable)
+ORDERING_KEYS = {
+    'title': ('title_lower', Lower('title'), False),
+    'author': ('author_lower', Lower('author'), False),
+    'publication_date': ('publication_date', None, True),
+    'created_at': ('created_at', None, False),
+}
+DEFAULT_ORDERING = '-created_at'
 
+# Comma-separated field names narrowing list and detail responses
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
 
-class BookViewSet(viewsets.ModelViewSet):
+# Upper bound for ?limit= on author suggestions
+MAX_AUTHOR_SUGGESTIONS = 50
+
+# Most keys per batch request; keeps the IN list within SQLite's 999 parameters
+MAX_BATCH_SIZE = 500
+# Range of the BigAutoField primary key; larger ids overflow the database driver
+MIN_BOOK_ID, MAX_BOOK_ID = -BigIntegerField.MAX_BIGINT - 1, BigIntegerField.MAX_BIGINT
+
+# Default and maximum ?limit= for the author/genre facet endpoints
+DEFAULT_FACET_LIMIT = 1000
+MAX_FACET_LIMIT = 10000
+
+
+class BookViewSet(CachedResponseMixin, ConditionalResponseMixin, viewsets.ModelViewSet):
     """ViewSet for book management with case-insensitive ordering."""
     
     queryset = Book.objects.all()
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    filter_backends = [DjangoFilterBackend, BookSearchFilter]
     filterset_class = BookFilterSet
     search_fields = ['title', 'author']
     ordering_fields = ['title', 'author', 'publication_date', 'created_at']
     ordering = ['-created_at']
 
+    def initial(self, request, *args, **kwargs):
+        """Switch the list endpoint to keyset pagination on request."""
+        super().initial(request, *args, **kwargs)
+        params = request.query_params
+        if params.get('cursor') or params.get('pagination') == 'cursor':
+            self.pagination_class = BookCursorPagination
+
+    def get_sort_key(self):
+        """Resolve ``?ordering=`` to a sort key; searches default to relevance."""
+        params = self.request.query_params
+        ordering_param = params.get('ordering')
+        if not ordering_param and params.get(api_settings.SEARCH_PARAM, '').strip():
+            return SortKey(SEARCH_RANK_FIELD, descending=True)
+        ordering_param = ordering_param or DEFAULT_ORDERING
+        name = ordering_param.removeprefix('-')
+        if name not in ORDERING_KEYS:
+            ordering_param = DEFAULT_ORDERING
+            name = ordering_param.removeprefix('-')
+        field, expression, nullable = ORDERING_KEYS[name]
+        return SortKey(field, ordering_param.startswith('-'), nullable, expression)
+
     def get_queryset(self):
         """Apply case-insensitive ordering for title and author fields."""
         queryset = super().get_queryset()
-        ordering_param = self.request.query_params.get('ordering')
-        
-        if not ordering_param:
-            return queryset.order_by('-created_at')
-            
-        # Handle case-insensitive ordering for title and author
-        if ordering_param in ['title', '-title']:
-            desc = ordering_param.startswith('-')
-            return queryset.annotate(title_lower=Lower('title')).order_by(
-                '-title_lower' if desc else 'title_lower'
-            )
-        elif ordering_param in ['author', '-author']:
-            desc = ordering_param.startswith('-')
-            return queryset.annotate(author_lower=Lower('author')).order_by(
-                '-author_lower' if desc else 'author_lower'
-            )
-        elif ordering_param in ['publication_date', '-publication_date', 'created_at', '-created_at']:
-            return queryset.order_by(ordering_param)
-            
-        return queryset.order_by('-created_at')
+        sort_key = self.get_sort_key()
+        if sort_key.expression is not None:
+            queryset = queryset.annotate(**{sort_key.field: sort_key.expression})
+        # A search rank ordering is applied by BookSearchFilter once annotated
+        if sort_key.field != SEARCH_RANK_FIELD:
+            queryset = queryset.order_by(*sort_key.order_by())
+        if self.action == 'list':
+            queryset = self.project_list_columns(queryset, sort_key)
+        elif self.action == 'retrieve' and self.fieldset is not None:
+            queryset = queryset.only(*self.fieldset, 'updated_at')
+        return queryset
+
+    def project_list_columns(self, queryset, sort_key):
+        """Fetch only the listed columns as dicts for the fast serializer path."""
+        columns = list(self.fieldset or BookListSerializer.Meta.fields)
+        # Cursor pagination reads the sort key and id from each row and the
+        # ETag the versions; the search rank is annotated later by BookSearchFilter
+        for column in ('id', 'updated_at', sort_key.field):
+            if column not in columns and column != SEARCH_RANK_FIELD:
+                columns.append(column)
+        return queryset.values(*columns)
+
+    @cached_property
+    def fieldset(self):
+        """
+        Field names selected with ``?fields=`` and ``?exclude=``, or None for all.
+
+        Only reads are narrowed; writes always use the full serializer.
+        """
+        if self.action not in ('list', 'retrieve', 'batch'):
+            return None
+        params = self.request.query_params
+        requested = [name.strip() for name in params.get(FIELDS_PARAM, '').split(',') if name.strip()]
+        excluded = [name.strip() for name in params.get(EXCLUDE_PARAM, '').split(',') if name.strip()]
+        if not requested and not excluded:
+            return None
+
+        available = list(self.get_serializer_class()().fields)
+        errors = {}
+        for param, names in ((FIELDS_PARAM, requested), (EXCLUDE_PARAM, excluded)):
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                errors[param] = [f'Unknown field(s): {", ".join(unknown)}. '
+                                 f'Choose from: {", ".join(available)}.']
+        fieldset = [name for name in requested or available if name not in excluded]
+        if not errors and not fieldset:
+            errors[EXCLUDE_PARAM] = ['At least one field must remain.']
+        if errors:
+            raise exceptions.ValidationError(errors)
+        return fieldset
 
     def get_serializer_class(self):
         """Dynamic serializer selection."""
@@ -53,9 +146,22 @@ class BookViewSet(viewsets.ModelViewSet):
             'create': BookCreateSerializer,
         }.get(self.action, BookSerializer)
 
+    def get_serializer(self, *args, **kwargs):
+        """Narrow the serializer to the requested fieldset."""
+        if self.fieldset is not None:
+            kwargs.setdefault('fields', self.fieldset)
+        return super().get_serializer(*args, **kwargs)
+
     @action(detail=False, methods=['patch'], url_path='update-by-author')
     def update_by_author(self, request):
-        """Bulk update books by author."""
+        """
+        Bulk update books by author.
+
+        The update runs as one ``UPDATE ... RETURNING`` statement. Only the
+        first page of updated books (newest first) is returned; ``next``
+        links to the rest on the list endpoint. With ``"async": true`` the
+        update is queued as a job instead and 202 is returned.
+        """
         author = request.data.get('author')
         update_data = request.data.get('update_data', {})
         
@@ -70,19 +176,165 @@ class BookViewSet(viewsets.ModelViewSet):
         if not filtered_data:
             return Response({'error': 'No valid fields to update'}, 
                            status=status.HTTP_400_BAD_REQUEST)
-        
-        # Update books
-        books = Book.objects.filter(author__icontains=author)
-        if not books.exists():
+
+        if request.data.get('async') in (True, 'true', '1'):
+            try:
+                job = enqueue_update_job(author, filtered_data)
+            except ValidationError as e:
+                return Response({'error': e.messages[0], 'errors': e.message_dict},
+                               status=status.HTTP_400_BAD_REQUEST)
+            data = BookUpdateJobSerializer(job).data
+            data['url'] = request.build_absolute_uri(reverse('book-job', kwargs={'job_id': job.pk}))
+            return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': data['url']})
+
+        page_size = api_settings.PAGE_SIZE
+        try:
+            with transaction.atomic():
+                updated_count, rows = update_books(
+                    Book.objects.filter(author__icontains=author), filtered_data,
+                    BookListSerializer.Meta.fields, limit=page_size,
+                )
+                if updated_count:
+                    invalidate_book_cache()
+        except ValidationError as e:
+            return Response({'error': e.messages[0], 'errors': e.message_dict},
+                           status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError as e:
+            if not is_duplicate_isbn_error(e):
+                raise
+            return Response({'error': DUPLICATE_ISBN_MESSAGE},
+                           status=status.HTTP_400_BAD_REQUEST)
+
+        if not updated_count:
             return Response({'error': f'No books found for author: {author}'}, 
                            status=status.HTTP_404_NOT_FOUND)
-        
-        with transaction.atomic():
-            updated_count = books.update(**filtered_data)
-        
+
+        next_url = None
+        if updated_count > page_size:
+            next_url = request.build_absolute_uri(
+                f"{reverse('book-list')}?{urlencode({'author': author, 'page': 2})}"
+            )
         return Response({
             'message': f'Updated {updated_count} books by {author}',
-            'books': BookListSerializer(books, many=True).data
+            'count': updated_count,
+            'next': next_url,
+            'books': BookListSerializer(rows, many=True).data
+        })
+
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>[0-9]+)', url_name='job')
+    def job(self, request, job_id=None):
+        """Progress of a queued bulk update."""
+        try:
+            job = BookUpdateJob.objects.get(pk=job_id)
+        except BookUpdateJob.DoesNotExist:
+            return Response({'error': f'No job found with id: {job_id}'},
+                           status=status.HTTP_404_NOT_FOUND)
+        return Response(BookUpdateJobSerializer(job).data)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """Bulk import books from a JSON array, NDJSON or CSV body."""
+        content_type = request.content_type.split(';')[0].strip().lower()
+        stream = request.stream or []
+        if content_type in ('application/x-ndjson', 'application/ndjson'):
+            rows = iter_ndjson(stream)
+        elif content_type == 'text/csv':
+            rows = iter_csv(stream)
+        else:
+            rows = request.data
+            if not isinstance(rows, list):
+                return Response({'error': 'Expected a JSON array of books'},
+                              status=status.HTTP_400_BAD_REQUEST)
+
+        result = import_books(rows)
+        return Response(result.as_dict())
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """Stream every matching book as NDJSON (default) or CSV."""
+        queryset = self.filter_queryset(self.get_queryset())
+        converters = row_converters(BookSerializer())
+        rows = iter_export_rows(queryset, converters)
+        renderer = request.accepted_renderer
+        if renderer.format == 'csv':
+            content = stream_csv(rows, [name for name, _, _ in converters])
+        else:
+            content = stream_ndjson(rows)
+        response = StreamingHttpResponse(
+            content, content_type=f'{renderer.media_type}; charset={renderer.charset}'
+        )
+        response['Content-Disposition'] = f'attachment; filename="books.{renderer.format}"'
+        return response
+
+    @action(detail=False, methods=['get', 'post'])
+    @read_only
+    def batch(self, request):
+        """
+        Fetch up to ``MAX_BATCH_SIZE`` books by ``ids`` or ``isbns`` in one query.
+
+        Keys are comma-separated in the query string or a JSON array in a
+        POST body. Books come back in request order with the detail
+        representation; keys that match no book are listed in ``missing``.
+        """
+        if request.method == 'GET':
+            return self.cached_response(request, self.batch_response)
+        return self.batch_response(request)
+
+    def batch_response(self, request):
+        source = request.query_params if request.method == 'GET' else request.data
+        given = [name for name in ('ids', 'isbns') if source.get(name) not in (None, '')]
+        if len(given) != 1:
+            return Response({'error': 'Provide either ids or isbns'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        name = given[0]
+        keys = source.get(name)
+        if isinstance(keys, str):
+            keys = [key.strip() for key in keys.split(',') if key.strip()]
+        # bool is an int subclass, so True would otherwise pass as id 1
+        if not isinstance(keys, list) or not all(
+            isinstance(key, (str, int)) and not isinstance(key, bool) for key in keys
+        ):
+            return Response({'error': f'{name} must be a list or a comma-separated string'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        keys = list(dict.fromkeys(keys))
+        if len(keys) > MAX_BATCH_SIZE:
+            return Response({'error': f'At most {MAX_BATCH_SIZE} books per batch'},
+                          status=status.HTTP_400_BAD_REQUEST)
+
+        # (key, lookup) for the first key of each distinct lookup, so 1 and
+        # "01" name one book; an invalid ISBN's lookup is None
+        field = 'id' if name == 'ids' else 'isbn13'
+        lookups = {}
+        for key in keys:
+            if name == 'ids':
+                try:
+                    lookup = int(key)
+                except ValueError:
+                    return Response({'error': 'ids must be integers'},
+                                  status=status.HTTP_400_BAD_REQUEST)
+                if not MIN_BOOK_ID <= lookup <= MAX_BOOK_ID:
+                    return Response({'error': f'ids must be between {MIN_BOOK_ID} and {MAX_BOOK_ID}'},
+                                  status=status.HTTP_400_BAD_REQUEST)
+            else:
+                try:
+                    validate_isbn(str(key))
+                except ValidationError:
+                    lookup = None
+                else:
+                    lookup = to_isbn13(str(key))
+            lookups.setdefault(key if lookup is None else lookup, (key, lookup))
+        lookups = list(lookups.values())
+
+        queryset = Book.objects.filter(
+            **{f'{field}__in': [lookup for _, lookup in lookups if lookup is not None]}
+        )
+        if self.fieldset is not None:
+            queryset = queryset.only(*self.fieldset, field)
+        books = {getattr(book, field): book for book in queryset}
+        found = [books[lookup] for _, lookup in lookups if lookup in books]
+        return Response({
+            'results': self.get_serializer(found, many=True).data,
+            'missing': [key for key, lookup in lookups if lookup not in books],
         })
 
     @action(detail=False, methods=['get'], url_path='by-author/(?P<author>[^/.]+)')
@@ -90,9 +342,62 @@ class BookViewSet(viewsets.ModelViewSet):
         if not author:
             return Response({'error': 'Author required'}, 
                           status=status.HTTP_400_BAD_REQUEST)
-        books = Book.objects.filter(author__icontains=author)
-        return Response({
+        # One query: the count is the length of the (unpaginated) result
+        books = list(Book.objects.filter(author__icontains=author).values(*BookListSerializer.Meta.fields))
+        data = {
             'author': author, 
-            'count': books.count(), 
+            'count': len(books), 
             'books': BookListSerializer(books, many=True).data
-        })
\ No newline at end of file
+        }
+        if not data['count']:
+            data['did_you_mean'] = [name for name, _ in suggest_authors(Book.objects.all(), author, limit=5)]
+        return Response(data)
+
+    @action(detail=False, methods=['get'], url_path='author-suggestions')
+    def author_suggestions(self, request):
+        """Typo-tolerant author lookup ranked by trigram similarity."""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'Query parameter q required'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), MAX_AUTHOR_SUGGESTIONS)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        suggestions = suggest_authors(Book.objects.all(), query, limit=max(limit, 1))
+        return Response({
+            'query': query,
+            'suggestions': [
+                {'author': name, 'similarity': round(similarity, 3)}
+                for name, similarity in suggestions
+            ]
+        })
+
+    @action(detail=False, methods=['get'])
+    def authors(self, request):
+        """Distinct authors with book counts."""
+        return self._facet_response(request, BookFacet.AUTHOR)
+
+    @action(detail=False, methods=['get'])
+    def genres(self, request):
+        """Distinct genres with book counts."""
+        return self._facet_response(request, BookFacet.GENRE)
+
+    def _facet_response(self, request, kind):
+        """Serve precomputed facet counts, optionally filtered by name prefix."""
+        try:
+            limit = min(int(request.query_params.get('limit', DEFAULT_FACET_LIMIT)), MAX_FACET_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'},
+                          status=status.HTTP_400_BAD_REQUEST)
+        facets = BookFacet.objects.filter(kind=kind)
+        prefix = request.query_params.get('q', '').strip()
+        if prefix:
+            facets = facets.filter(value__istartswith=prefix)
+        return Response({
+            'results': [
+                {'name': value, 'count': count}
+                for value, count in facets.values_list('value', 'count')[:max(limit, 1)]
+            ]
+        })
@@ -0,0 +1,22 @@
+#!/bin/sh
+# Container entry point: wait for Postgres -> migrate -> collectstatic -> (seed) -> serve
+set -e
+
+until pg_isready -h "${POSTGRES_HOST:-db}" -p "${POSTGRES_PORT:-5432}" -U "${POSTGRES_USER:-postgres}" -d "${POSTGRES_DB:-postgres}"; do
+  echo 'Waiting for Postgres...'
+  sleep 2
+done
+echo 'Postgres is up.'
+
+python manage.py migrate --noinput
+python manage.py collectstatic --noinput
+
+# populate_books replaces the whole catalogue, so only seed when asked
+if [ "${SEED_BOOKS:-false}" = "true" ]; then
+  python manage.py populate_books ${SEED_BOOKS_ARGS:-}
+fi
+
+if [ "${DJANGO_SERVER:-gunicorn}" = "runserver" ]; then
+  exec python manage.py runserver 0.0.0.0:"${PORT:-8000}"
+fi
+exec gunicorn --config gunicorn.conf.py
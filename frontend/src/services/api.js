@@ -15,6 +15,9 @@ export const bookAPI = {
   
   // Get book details
   getBook: (id) => api.get(`${id}/`),
+
+  // Get many books by id in one request (order kept, unknown ids in `missing`)
+  getBooksByIds: (ids) => api.post('batch/', { ids }),
   
   // Create book
   createBook: (data) => api.post('', data),
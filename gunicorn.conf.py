@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for the production container (started by docker-entrypoint.sh).
+
+SERVER_MODE=wsgi (default) runs threaded sync workers on library.wsgi;
+SERVER_MODE=asgi runs uvicorn workers on library.asgi with the async read views.
+"""
+import multiprocessing
+import os
+
+server_mode = os.environ.get('SERVER_MODE', 'wsgi').lower()
+cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+if server_mode == 'asgi':
+    wsgi_app = 'library.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+    # One event loop per core
+    default_workers = cpus
+else:
+    wsgi_app = 'library.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+    default_workers = cpus * 2 + 1
+
+workers = int(os.environ.get('WEB_CONCURRENCY', default_workers))
+
+# Import Django once in the master so workers fork with a warm app
+preload_app = True
+
+# Recycle workers periodically to bound memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Never share database sockets or pools opened in the master with forked workers
+    from django.db import connections
+    for connection in connections.all(initialized_only=True):
+        if hasattr(connection, 'close_pool'):
+            connection.close_pool()
+    connections.close_all()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'library.settings')
+# Use the native async read views unless explicitly disabled
+os.environ.setdefault('BOOK_ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
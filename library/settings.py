@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+from copy import deepcopy
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'corsheaders',
@@ -41,6 +43,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'books.compression.compression_middleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,6 +52,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'books.middleware.replica_routing_middleware',
 ]
 
 ROOT_URLCONF = 'library.urls'
@@ -79,6 +84,7 @@ DATABASES = {
         'HOST': os.environ.get('POSTGRES_HOST', 'db'),
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
         'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('true', '1'),
         'TEST': {
             'NAME': 'test_book_library',
         },
@@ -88,13 +94,98 @@ DATABASES = {
     }
 }
 
+# Native psycopg 3 connection pool, one per worker process. Pooled connections
+# are returned after each request, so persistent connections are turned off;
+# CONN_HEALTH_CHECKS makes the pool verify connections on checkout instead.
+# Size it so WEB_CONCURRENCY * DB_POOL_MAX_SIZE stays below max_connections.
+if os.environ.get('DB_POOL', 'true').lower() in ('true', '1'):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        # Recycle idle and long-lived connections
+        'max_idle': 300,
+        'max_lifetime': 1800,
+    }
+
+# Opt-in request timing/SQL instrumentation: Server-Timing headers, slow
+# request/query logs and Prometheus histograms at /metrics
+REQUEST_METRICS = os.environ.get('REQUEST_METRICS', 'false').lower() in ('true', '1')
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '500'))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+if REQUEST_METRICS:
+    # Outermost, so the timing covers every other middleware
+    MIDDLEWARE.insert(0, 'books.metrics.RequestMetricsMiddleware')
+
+# Read replicas as comma-separated host[:port] (same credentials as the primary).
+# Safe requests read books and facets from a random replica; a client's own
+# writes pin its reads to the primary for DB_REPLICA_STICKY_SECONDS.
+BOOK_READ_REPLICAS = []
+for number, address in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = address.strip().partition(':')
+    alias = f'replica_{number}'
+    DATABASES[alias] = deepcopy(DATABASES['default'])
+    DATABASES[alias].update(HOST=host, PORT=port or DATABASES['default']['PORT'], TEST={'MIRROR': 'default'})
+    BOOK_READ_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['books.routers.PrimaryReplicaRouter']
+DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '10'))
+
+# Cache - local memory by default, Redis when REDIS_URL is set
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Book list/detail response cache (seconds, 0 disables). Writes invalidate it
+# through a generation counter stored in the cache, so it is only on by
+# default when every process shares the cache (REDIS_URL); with per-process
+# local memory, the other workers would keep serving stale responses.
+BOOK_CACHE_ALIAS = 'default'
+BOOK_CACHE_TIMEOUT = int(os.environ.get('BOOK_CACHE_TIMEOUT', '300' if os.environ.get('REDIS_URL') else '0'))
+
+# Compress JSON responses at least this large with zstd/brotli/gzip (0 disables)
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+# Estimate instead of counting unfiltered book lists at least this large (0 disables)
+BOOK_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('BOOK_ESTIMATED_COUNT_THRESHOLD', '100000'))
+
+# Serve the book read endpoints with native async views (set by library.asgi)
+BOOK_ASYNC_VIEWS = os.environ.get('BOOK_ASYNC_VIEWS', 'false').lower() in ('true', '1')
+
 # Use SQLite for testing to avoid PostgreSQL template issues
 import sys
 if 'test' in sys.argv:
-    DATABASES['default'] = {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': ':memory:'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:'
+        },
+        # Independent second database for replica routing tests
+        'replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ':memory:'
+        },
+    }
+    BOOK_READ_REPLICAS = []
+    # Tests never run collectstatic, so there is nothing for WhiteNoise to serve
+    MIDDLEWARE = [name for name in MIDDLEWARE if not name.startswith('whitenoise.')]
+    # Local stand-in cache; enabled per test with override_settings
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
+    BOOK_CACHE_TIMEOUT = 0
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -118,15 +209,28 @@ TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
-# Static files
+# Static files, served by WhiteNoise with compressed, cache-busted names.
+# Development and tests skip collectstatic, so they use the plain storage.
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG or 'test' in sys.argv
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework configuration
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'books.pagination.EstimatedCountPagination',
     'PAGE_SIZE': int(os.environ.get('PAGE_SIZE', '100')),
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -140,6 +244,23 @@ CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:
 CORS_ALLOW_CREDENTIALS = os.environ.get('CORS_ALLOW_CREDENTIALS', 'true').lower() in ('true', '1')
 CORS_ALLOW_ALL_ORIGINS = os.environ.get('CORS_ALLOW_ALL_ORIGINS', 'false').lower() in ('true', '1')
 
+# Log app warnings (slow requests/queries, failed jobs) to the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'books': {
+            'handlers': ['console'],
+            'level': os.environ.get('LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 # Logging configuration to suppress PostgreSQL collation warnings
 import sys
 if 'test' in sys.argv:
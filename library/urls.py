@@ -14,10 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
+from books.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include("books.urls"))
+    path('metrics', metrics_view, name='metrics'),
+    path('', include("books.async_urls" if settings.BOOK_ASYNC_VIEWS else "books.urls"))
 ]